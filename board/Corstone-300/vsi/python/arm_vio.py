@@ -11,6 +11,7 @@
 #More details.
 
 import logging
+import vsi_log
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,9 @@ logger = logging.getLogger(__name__)
 #verbosity = logging.WARNING
 verbosity = logging.ERROR
 
+# Verbosity level override by VSI_LOG_LEVEL environment variable
+verbosity = vsi_log.getVerbosity(verbosity)
+
 # [debugging] Verbosity settings
 level = { 10: "DEBUG",  20: "INFO",  30: "WARNING",  40: "ERROR" }
 logging.basicConfig(format='Py: %(name)s : [%(levelname)s]\t%(message)s', level = verbosity)
@@ -95,5 +99,9 @@ def wrValue(index, value):
     return
 
 
+## Remove logging calls disabled by verbosity level from handlers
+vsi_log.optimize(globals(), verbosity)
+
+
 ## @}
 
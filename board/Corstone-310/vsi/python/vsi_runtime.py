@@ -0,0 +1,275 @@
+# Copyright (c) 2026 Arm Limited. All rights reserved.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the License); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Python VSI Runtime module
+# This module implements the VSI peripheral handlers (IRQ, Timer, DMA and user registers)
+# shared by the vStream audio and video channels. Each arm_vsiN.py script creates a channel
+# with its channel number and client module (vsi_audio or vsi_video) and exports the channel
+# handlers. The client module is imported when the channel is initialized, so only the
+# channels used by the simulation load their client. Each channel logs with its own logger
+# and verbosity level.
+
+try:
+    import importlib
+    import logging
+
+    import vsi_log
+except ImportError as err:
+    print(f"VSI:Runtime:ImportError: {err}")
+    raise
+except Exception as e:
+    print(f"VSI:Runtime:Exception: {type(e).__name__}")
+    raise
+
+
+# Timer Control register definitions
+Timer_Control_Run_Msk      = 1<<0
+Timer_Control_Periodic_Msk = 1<<1
+Timer_Control_Trig_IRQ_Msk = 1<<2
+Timer_Control_Trig_DMA_Msk = 1<<3
+
+# DMA Control register definitions
+DMA_Control_Enable_Msk    = 1<<0
+DMA_Control_Direction_Msk = 1<<1
+DMA_Control_Direction_P2M = 0<<1
+DMA_Control_Direction_M2P = 1<<1
+
+
+class VsiChannel:
+    """
+    VSI peripheral channel forwarding register, DMA and timer accesses to a vStream client module.
+    """
+    def __init__(self, channel, client, verbosity=logging.ERROR, logger=None):
+        """
+        Initialize the channel.
+
+        The channel handlers are recompiled without the logging calls below the verbosity level
+        of the channel (see vsi_log.optimizeClass), other channels are not affected.
+        Args:
+            channel: VSI channel number (0..7).
+            client: Name of the client module ('vsi_audio' or 'vsi_video').
+            verbosity: Verbosity level, logging calls below this level are removed from the handlers and the client.
+            logger: Logger of the channel (default: logger named after the channel).
+        Returns:
+            None
+        """
+        self.__class__        = vsi_log.optimizeClass(VsiChannel, verbosity)
+
+        self.channel          = channel
+        self.client_name      = client
+        self.client           = None
+        self.verbosity        = verbosity
+        self.logger           = logger if logger is not None else logging.getLogger(f"{__name__}.{channel}")
+
+        # IRQ registers
+        self.IRQ_Status       = 0
+
+        # Timer registers
+        self.Timer_Control    = 0
+        self.Timer_Interval   = 0
+
+        # DMA registers
+        self.DMA_Control      = 0
+
+        # User registers
+        self.Regs             = [0] * 64
+
+        # Data buffer
+        self.Data             = bytearray()
+
+        # Streaming Server Connection Status
+        self.Server_Connected = False
+
+    def init(self, address, authkey, **options):
+        """
+        Import the client module and connect to the streaming server.
+
+        Args:
+            address: Tuple (IP, port) for the server.
+            authkey: Authorization key for server connection.
+            options: Additional keyword arguments of the client init function.
+        Returns:
+            None
+        """
+        self.logger.info(f"init() called, channel {self.channel}")
+
+        self.client = importlib.import_module(self.client_name)
+        vsi_log.optimize(vars(self.client), self.verbosity)
+
+        self.Server_Connected = self.client.init(address, authkey, **options)
+
+    def rdIRQ(self):
+        """
+        Read interrupt request (the VSI IRQ Status Register).
+
+        Returns:
+            value: Value read (32-bit).
+        """
+        self.logger.info("rdIRQ() called")
+
+        value = self.IRQ_Status
+        self.logger.debug(f"Read IRQ_Status: 0x{value:08X}")
+
+        return value
+
+    def wrIRQ(self, value):
+        """
+        Write interrupt request (the VSI IRQ Status Register).
+
+        Args:
+            value: Value to write (32-bit).
+        Returns:
+            value: Value written (32-bit).
+        """
+        self.logger.info(f"wrIRQ(value=0x{value:08X}) called")
+
+        self.IRQ_Status = value
+        self.logger.debug(f"wrIRQ: write IRQ_Status: 0x{value:08X}")
+
+        return value
+
+    def wrTimer(self, index, value):
+        """
+        Write Timer registers (the VSI Timer Registers).
+
+        Args:
+            index: Timer register index (zero based).
+            value: Value to write (32-bit).
+        Returns:
+            value: Value written (32-bit).
+        """
+        self.logger.info(f"wrTimer(index={index}, value=0x{value:08X}) called")
+
+        if   index == 0:
+            self.Timer_Control = value
+            self.logger.debug(f"wrTimer: write Timer_Control: 0x{value:08X}")
+        elif index == 1:
+            self.Timer_Interval = value
+            self.logger.debug(f"wrTimer: write Timer_Interval: 0x{value:08X}")
+
+        return value
+
+    def timerEvent(self):
+        """
+        Timer event (called at Timer Overflow).
+
+        Returns:
+            None
+        """
+        self.logger.info("timerEvent() called")
+
+        if self.Server_Connected:
+            self.client.timerEvent()
+
+    def wrDMA(self, index, value):
+        """
+        Write DMA registers (the VSI DMA Registers).
+
+        Args:
+            index: DMA register index (zero based).
+            value: Value to write (32-bit).
+        Returns:
+            value: Value written (32-bit).
+        """
+        self.logger.info(f"wrDMA(index={index}, value=0x{value:08X}) called")
+
+        if   index == 0:
+            self.DMA_Control = value
+            self.logger.debug(f"wrDMA: write DMA_Control: 0x{value:08X}")
+
+        return value
+
+    def rdDataDMA(self, size):
+        """
+        Read data from peripheral for DMA P2M transfer (VSI DMA).
+
+        Args:
+            size: Size of data to read (in bytes, multiple of 4).
+        Returns:
+            data: Data read (bytearray).
+        """
+        self.logger.info(f"rdDataDMA(size={size}) called")
+
+        if self.Server_Connected:
+            self.Data = self.client.rdDataDMA(size)
+
+        n = min(len(self.Data), size)
+        data = bytearray(size)
+        data[0:n] = self.Data[0:n]
+        self.logger.debug(f"rdDataDMA: read data ({size} bytes)")
+
+        return data
+
+    def wrDataDMA(self, data, size):
+        """
+        Write data to peripheral for DMA M2P transfer (VSI DMA).
+
+        Args:
+            data: Data to write (bytearray).
+            size: Size of data to write (in bytes, multiple of 4).
+        Returns:
+            None
+        """
+        self.logger.info(f"wrDataDMA(data={type(data).__name__}, size={size}) called")
+
+        self.Data = data
+        self.logger.debug(f"wrDataDMA: write data ({size} bytes)")
+
+        if self.Server_Connected:
+            self.client.wrDataDMA(data, size)
+
+    def rdRegs(self, index):
+        """
+        Read user registers (the VSI User Registers).
+
+        Args:
+            index: User register index (zero based).
+        Returns:
+            value: Value read (32-bit).
+        """
+        self.logger.info(f"rdRegs(index={index}) called")
+
+        if self.Server_Connected:
+            self.Regs[index] = self.client.rdRegs(index)
+
+        value = self.Regs[index]
+
+        # Log the value read from the register
+        self.logger.debug(f"rdRegs: read Regs[{index}]: 0x{value:08X}")
+
+        return value
+
+    def wrRegs(self, index, value):
+        """
+        Write user registers (the VSI User Registers).
+
+        Args:
+            index: User register index (zero based).
+            value: Value to write (32-bit).
+        Returns:
+            value: Value written (32-bit).
+        """
+        self.logger.info(f"wrRegs(index={index}, value=0x{value:08X}) called")
+
+        if self.Server_Connected:
+            value = self.client.wrRegs(index, value)
+
+        self.Regs[index] = value
+
+        # Log the value written to the register
+        self.logger.debug(f"wrRegs: write Regs[{index}] = 0x{value:08X}")
+
+        return value
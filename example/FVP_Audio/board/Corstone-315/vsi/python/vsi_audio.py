@@ -22,10 +22,16 @@ try:
     import time
     import atexit
     import logging
+    import secrets
     import subprocess
+    from collections import deque
     from multiprocessing.connection import Client, Connection
     from os import path, getcwd
     from os import name as os_name
+
+    from vsi_protocol import FLAG_EOS, FLAG_ERROR, SEQ_MASK, sendMessage, recvMessage, packValues, unpackValues, packStrings
+    from vsi_protocol import serverAddress, readAddress
+    from vsi_regs import RegisterMap, READ_ONLY
 except ImportError as err:
     print(f"VSI:Audio:ImportError: {err}")
     raise
@@ -63,12 +69,24 @@ class AudioClient:
         # Connection object
         self.conn = None
 
+        # Sequence number of the last command, sequence numbers of the commands waiting for a reply
+        self.seq              = 0
+        self.replies          = deque()
+
+        # Read requests kept outstanding (read-ahead), read requests not yet replied
+        self.read_ahead       = 0
+        self.read_pending     = 0
+
+        # Filename sent to the server and not yet validated, validation result
+        self.filename_pending = False
+        self.filename_valid   = False
+
     def connectToServer(self, address, authkey):
         """
         Attempt to connect to the VSI audio server at the given address with the provided authkey.
 
         Args:
-            address: The (IP, port) tuple for the server to connect to.
+            address: The (IP, port) tuple or Unix domain socket path for the server to connect to.
             authkey: The authorization key for server connection.
         Returns:
             None
@@ -84,6 +102,50 @@ class AudioClient:
                 self.conn = None
             time.sleep(0.025)
 
+    def _send(self, opcode, payload=b'', reply=True):
+        """
+        Send a command message to the server.
+        Args:
+            opcode: Command code.
+            payload: Command payload.
+            reply: The server replies to the command.
+        Returns:
+            None
+        """
+        self.seq = (self.seq + 1) & SEQ_MASK
+        sendMessage(self.conn, opcode, self.seq, payload)
+        if reply:
+            self.replies.append(self.seq)
+
+    def _recv(self):
+        """
+        Receive the reply to the oldest command waiting for a reply.
+        Returns:
+            tuple: (flags, payload) of the reply message.
+        """
+        opcode, flags, seq, payload = recvMessage(self.conn)
+        expected = self.replies.popleft()
+        if seq != expected:
+            logger.error(f"_recv: reply sequence number {seq} does not match command {expected}")
+        if flags & FLAG_ERROR:
+            logger.error(f"_recv: command {opcode} failed on the server")
+
+        return flags, payload
+
+    def _call(self, opcode, *values):
+        """
+        Send a command with integer arguments and wait for the reply.
+        Args:
+            opcode: Command code.
+            values: Integer command arguments.
+        Returns:
+            Tuple of integer values of the reply.
+        """
+        self._send(opcode, packValues(*values))
+        _, payload = self._recv()
+
+        return unpackValues(payload)
+
     def setMode(self, mode):
         """
         Set the mode of the audio stream (input/output).
@@ -92,8 +154,9 @@ class AudioClient:
         Returns:
             Current mode value (0=input, 1=output).
         """
-        self.conn.send([self.SET_MODE, mode])
-        current_mode = self.conn.recv()
+        self._takeFilename()
+        self._cancelReads()
+        current_mode, = self._call(self.SET_MODE, mode)
 
         return current_mode
 
@@ -105,49 +168,90 @@ class AudioClient:
         Returns:
             Device index actually set.
         """
-        self.conn.send([self.SET_DEVICE, device])
-        device_index = self.conn.recv()
+        self._takeFilename()
+        self._cancelReads()
+        device_index, = self._call(self.SET_DEVICE, device)
 
         return device_index
 
     def setFilename(self, filename):
         """
-        Set the filename for the audio stream on the server.
+        Set the filename for the audio stream on the server, without waiting for the validation.
+
+        The validation result is taken with filenameValid().
         Args:
             filename: The name of the file to set on the server.
         Returns:
-            True if the filename is valid, False otherwise.
+            None
+        """
+        self._takeFilename()
+        self._cancelReads()
+        self._send(self.SET_FILENAME, packStrings(getcwd(), filename))
+        self.filename_pending = True
+        self.filename_valid   = False
+
+    def _takeFilename(self, wait=True):
+        """
+        Take the filename validation reply from the server.
+        Args:
+            wait: Wait for the reply if it is not received yet.
+        Returns:
+            None
+        """
+        if self.filename_pending and (wait or self.conn.poll()):
+            _, payload = self._recv()
+            self.filename_valid   = bool(unpackValues(payload)[0])
+            self.filename_pending = False
+            if not self.filename_valid:
+                logger.error("_takeFilename: filename validation failed, file not found on server")
+
+    def filenameValid(self, wait=True):
+        """
+        Get the filename validation result.
+        Args:
+            wait: Wait for the server reply if it is not received yet.
+        Returns:
+            True if the filename is valid, False if not, None if the reply is not received yet.
         """
-        self.conn.send([self.SET_FILENAME, getcwd(), filename])
-        filename_valid = self.conn.recv()
+        self._takeFilename(wait)
+        if self.filename_pending:
+            return None
 
-        return filename_valid
+        return self.filename_valid
 
-    def configureStream(self, channels, sample_rate, sample_bits):
+    def configureStream(self, channels, sample_rate, sample_bits, sample_format=0):
         """
         Configure the audio stream parameters on the server.
         Args:
             channels: Number of audio channels (1=mono, 2=stereo).
             sample_rate: Sample rate in Hz (e.g., 44100, 48000).
             sample_bits: Bit depth (8, 16, 24, 32).
+            sample_format: Sample format (0=integer PCM, 1=32-bit float).
         Returns:
             True if configuration is valid, False otherwise.
         """
-        self.conn.send([self.STREAM_CONFIGURE, channels, sample_rate, sample_bits])
-        configuration_valid = self.conn.recv()
+        self._takeFilename()
+        self._cancelReads()
+        configuration_valid, = self._call(self.STREAM_CONFIGURE, channels, sample_rate, sample_bits, sample_format)
 
-        return configuration_valid
+        return bool(configuration_valid)
 
     def enableStream(self):
         """
         Enable the audio stream on the server in the specified mode (input/output).
         Returns:
-            `True` if the stream is active, `False` otherwise.
+            `True` if the stream is active, `False` otherwise (also when the server cannot
+            stream because PyAudio or NumPy is not available).
         """
-        self.conn.send([self.STREAM_ENABLE])
-        stream_active = self.conn.recv()
+        self._takeFilename()
+        self._cancelReads()
+        self._send(self.STREAM_ENABLE)
+        flags, payload = self._recv()
+        if flags & FLAG_ERROR:
+            return False
+        stream_active, = unpackValues(payload)
 
-        return stream_active
+        return bool(stream_active)
 
     def disableStream(self):
         """
@@ -155,22 +259,67 @@ class AudioClient:
         Returns:
             True if the stream is no longer active, False otherwise.
         """
-        self.conn.send([self.STREAM_DISABLE])
-        stream_active = self.conn.recv()
+        self._takeFilename()
+        self._send(self.STREAM_DISABLE)
+        # Replies to the outstanding read requests precede the reply to STREAM_DISABLE
+        self._cancelReads()
+        _, payload = self._recv()
+        stream_active, = unpackValues(payload)
+
+        return bool(stream_active)
+
+    def startReads(self, depth):
+        """
+        Start the read-ahead for the active input stream.
 
-        return stream_active
+        After each read, `depth` read requests of the same size are kept outstanding, so that
+        the server reads the next blocks while the simulation runs.
+        Args:
+            depth: Number of outstanding read requests (0 = request each block on read).
+        Returns:
+            None
+        """
+        self.read_ahead = depth
+
+    def _cancelReads(self):
+        """
+        Stop the read-ahead and discard the replies to the outstanding read requests.
+        Returns:
+            None
+        """
+        self.read_ahead = 0
+        while self.read_pending > 0:
+            self._recv()
+            self.read_pending -= 1
 
     def readAudio(self, size):
         """
-        Request audio data from the server.
+        Read audio data from the server.
+
+        With read-ahead, the data of the oldest outstanding read request is returned and
+        new requests are sent. Blocks requested before a change of `size` are returned with
+        the size they were requested with. The read-ahead stops at the end of stream.
         Args:
             size: Number of bytes to read.
         Returns:
-            tuple: (data, eos) where data is a Bytearray of audio data and eos is a Boolean indicating end-of-stream.
+            tuple: (data, eos) where data is a bytes-like object of audio data and eos is a Boolean indicating end-of-stream.
         """
-        self.conn.send([self.AUDIO_READ, size])
-        data = self.conn.recv_bytes()
-        eos  = self.conn.recv()
+        self._takeFilename()
+        if self.read_pending == 0:
+            self._send(self.AUDIO_READ, packValues(size))
+            self.read_pending += 1
+
+        flags, data = self._recv()
+        self.read_pending -= 1
+
+        eos = bool(flags & FLAG_EOS)
+        if eos:
+            # Requests sent after the end of stream are answered without data
+            self._cancelReads()
+        else:
+            while self.read_pending < self.read_ahead:
+                self._send(self.AUDIO_READ, packValues(size))
+                self.read_pending += 1
 
         return data, eos
 
@@ -182,8 +331,7 @@ class AudioClient:
         Returns:
             None
         """
-        self.conn.send([self.AUDIO_WRITE])
-        self.conn.send_bytes(data)
+        self._send(self.AUDIO_WRITE, data, reply=False)
 
     def closeServer(self):
         """
@@ -193,7 +341,10 @@ class AudioClient:
         """
         try:
             if isinstance(self.conn, Connection):
-                self.conn.send([self.CLOSE_SERVER])
+                # Take the replies to the outstanding commands, the server must not reply to a closed connection
+                self._takeFilename()
+                self._cancelReads()
+                self._send(self.CLOSE_SERVER, reply=False)
                 self.conn.close()
         except Exception as e:
             logger.error(f'Exception occurred on cleanup: {e}')
@@ -208,6 +359,8 @@ FILENAME                  = ""    # Regs[3]  // Filename string array
 CHANNELS                  = 1     # Regs[4]  // Number of audio channels
 SAMPLE_RATE               = 16000 # Regs[5]  // Sample rate
 SAMPLE_BITS               = 16    # Regs[6]  // Bits per sample
+SAMPLE_FORMAT             = 0     # Regs[7]  // Sample format: integer PCM, float
+FILENAME_PACKED           = 0     # Regs[8]  // Filename string, 4 characters per write
 
 
 # CONTROL register bit definitions
@@ -222,6 +375,11 @@ CONTROL_MODE_IN           = 0
 CONTROL_MODE_OUT          = 1
 
 
+# SAMPLE_FORMAT register values
+SAMPLE_FORMAT_PCM         = 0     # Integer PCM (8-bit unsigned, 16/24/32-bit signed)
+SAMPLE_FORMAT_FLOAT       = 1     # IEEE 754 float (SAMPLE_BITS = 32)
+
+
 # STATUS register bit definitions
 STATUS_ACTIVE_Msk         = 1<<0    # Stream is active
 STATUS_DATA_Msk           = 1<<1    # Data is available
@@ -230,6 +388,10 @@ STATUS_FILE_NAME_Msk      = 1<<3    # File name latched/received
 STATUS_FILE_VALID_Msk     = 1<<4    # File is valid
 
 
+# Number of audio read requests kept outstanding while a continuous input stream is active (0 = request each block on read)
+READ_AHEAD                = 2
+
+
 # Global variables for audio client and filename handling
 Audio                     = AudioClient()
 
@@ -246,15 +408,20 @@ def cleanup():
 def init(address, authkey):
     """
     Initialize connection to the VSI Audio Server and start the server process if not already running.
+
+    The server is started for this client only. It binds a free TCP port instead of the configured port
+    and reports the bound address through a pipe, so that simulations running in parallel do not collide.
     Args:
-        address: Tuple (IP, port) for the server.
-        authkey: Authorization key for server connection.
+        address: Tuple (IP, port) for the server, or ('unix', port) for a Unix domain socket
+                 (see vsi_protocol.serverAddress).
+        authkey: Authorization key for server connection. The server uses the key with a random per-run suffix.
     Returns:
         None
     """
 
     base_dir = path.dirname(__file__)
     server_path = path.join(base_dir, 'vsi_audio_server.py')
+    address = serverAddress(address)
 
     logger.info("Start audio server")
     if path.isfile(server_path):
@@ -263,14 +430,24 @@ def init(address, authkey):
             py_cmd = 'python'
         else:
             py_cmd = 'python3'
-        cmd = f"{py_cmd} {server_path} "\
-              f"--ip {address[0]} "\
-              f"--port {address[1]} "\
-              f"--authkey {authkey}"
-        subprocess.Popen(cmd, shell=True)
+        # Per-run authorization key
+        authkey = f"{authkey}-{secrets.token_hex(8)}"
+        cmd = [py_cmd, server_path,
+               "--authkey", authkey,
+               "--report"]
+        if isinstance(address, str):
+            cmd += ["--unix", address]
+        else:
+            # TCP port is allocated by the server
+            cmd += ["--ip", address[0], "--port", "0"]
+        # Server reports the bound address through its standard output
+        server = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+        address = readAddress(server.stdout, address)
+        logger.info(f"Audio server address: {address}")
 
         # Connect to Audio Server
-        Audio.connectToServer(address, authkey)
+        if address is not None:
+            Audio.connectToServer(address, authkey)
         if Audio.conn == None:
             logger.error("Server not connected")
     else:
@@ -350,6 +527,8 @@ def wrCONTROL(value):
 
     Args:
         value: 32-bit value to write to CONTROL register.
+    Returns:
+        value: Value written.
     """
     global CONTROL, STATUS
 
@@ -367,16 +546,24 @@ def wrCONTROL(value):
         if (value & CONTROL_ENABLE_Msk) != 0:
             logger.info("wrCONTROL: CONTROL register updated: ENABLE bit set")
 
+            # Take the filename validation result before the stream is configured
+            updateFileValid(wait=True)
+
             # Configure stream
-            configuration_valid = Audio.configureStream(CHANNELS, SAMPLE_RATE, SAMPLE_BITS)
+            configuration_valid = Audio.configureStream(CHANNELS, SAMPLE_RATE, SAMPLE_BITS, SAMPLE_FORMAT)
             if configuration_valid:
                 # Configuration is valid, enable stream
                 server_active = Audio.enableStream()
 
                 if server_active:
+                    if (value & (CONTROL_MODE_Msk | CONTROL_CONTINUOUS_Msk)) == CONTROL_CONTINUOUS_Msk:
+                        # Continuous input stream: server reads the next blocks while the simulation runs
+                        Audio.startReads(READ_AHEAD)
+
                     STATUS |=  STATUS_ACTIVE_Msk
                     STATUS &= ~STATUS_EOS_Msk
                 else:
+                    STATUS &= ~STATUS_ACTIVE_Msk
                     logger.error("wrCONTROL: enable stream failed")
             else:
                 logger.error("wrCONTROL: configure stream failed")
@@ -389,6 +576,8 @@ def wrCONTROL(value):
 
     CONTROL = value
 
+    return value
+
 
 def rdSTATUS():
     """
@@ -398,7 +587,12 @@ def rdSTATUS():
         status: Current STATUS register value (32-bit)
     """
     global STATUS
-    logger.info(f"rdSTATUS: read STATUS: 0x{STATUS:08X}")
+
+    if (STATUS & (STATUS_FILE_NAME_Msk | STATUS_FILE_VALID_Msk)) == STATUS_FILE_NAME_Msk:
+        # Filename validation pending: update FILE_VALID bit if the server reply is received
+        updateFileValid(wait=False)
+
+    logger.info(f"rdSTATUS: read {Registers.decode(1, STATUS)}")
     value = STATUS
 
     # Clear DATA bit on read of STATUS register
@@ -416,12 +610,14 @@ def wrDEVICE(value):
     Args:
         value: Device index to set.
     Returns:
-        None
+        value: Value written.
     """
     global DEVICE
     DEVICE = Audio.setDevice(value)
     logger.info(f"wrDEVICE: DEVICE register set to {DEVICE}")
 
+    return value
+
 
 def rdFILENAME():
     """
@@ -446,7 +642,7 @@ def wrFILENAME(value):
     Args:
         value: Character to append (as string or int)
     Returns:
-        None
+        value: Value written.
     """
     global FILENAME, STATUS
 
@@ -471,11 +667,66 @@ def wrFILENAME(value):
         STATUS |= STATUS_FILE_NAME_Msk
         logger.debug("wrFILENAME: STATUS register updated: FILE_NAME bit set")
 
-        if Audio.setFilename(FILENAME) == True:
-            STATUS |= STATUS_FILE_VALID_Msk
-            logger.debug("wrFILENAME: STATUS register updated: FILE_VALID bit set")
-        else:
-            logger.error("wrFILENAME: Filename validation failed, file not found on server")
+        # Filename is validated by the server in the background (see updateFileValid)
+        Audio.setFilename(FILENAME)
+
+    return value
+
+
+def wrFILENAME_PACKED(value):
+    """
+    Write FILENAME_PACKED register (user register).
+
+    Append up to 4 characters packed in argument `value` (first character in the lowest byte)
+    to the filename string, like 4 writes to the FILENAME register.
+    A zero byte sets the null terminator, the following bytes are ignored.
+    Args:
+        value: Packed characters (32-bit)
+    Returns:
+        value: Value written.
+    """
+    for shift in (0, 8, 16, 24):
+        char = (value >> shift) & 0xFF
+        wrFILENAME(char)
+        if char == 0:
+            break
+
+    return value
+
+
+def updateFileValid(wait):
+    """
+    Update the FILE_VALID bit of the STATUS register with the server filename validation result.
+
+    Args:
+        wait: Wait for the server reply if it is not received yet.
+    Returns:
+        None
+    """
+    global STATUS
+
+    if (STATUS & (STATUS_FILE_NAME_Msk | STATUS_FILE_VALID_Msk)) != STATUS_FILE_NAME_Msk:
+        return
+
+    if Audio.filenameValid(wait):
+        STATUS |= STATUS_FILE_VALID_Msk
+        logger.debug("updateFileValid: STATUS register updated: FILE_VALID bit set")
+
+
+# User register map
+Registers = RegisterMap(globals())
+Registers.register(0, "CONTROL",  write=wrCONTROL,
+                   fields={"ENABLE": CONTROL_ENABLE_Msk, "MODE": CONTROL_MODE_Msk, "CONTINUOUS": CONTROL_CONTINUOUS_Msk})
+Registers.register(1, "STATUS",   read=rdSTATUS, write=READ_ONLY,
+                   fields={"ACTIVE": STATUS_ACTIVE_Msk, "DATA": STATUS_DATA_Msk, "EOS": STATUS_EOS_Msk,
+                           "FILE_NAME": STATUS_FILE_NAME_Msk, "FILE_VALID": STATUS_FILE_VALID_Msk})
+Registers.register(2, "DEVICE",   write=wrDEVICE)
+Registers.register(3, "FILENAME", read=rdFILENAME, write=wrFILENAME)
+Registers.register(4, "CHANNELS")
+Registers.register(5, "SAMPLE_RATE")
+Registers.register(6, "SAMPLE_BITS")
+Registers.register(7, "SAMPLE_FORMAT")
+Registers.register(8, "FILENAME_PACKED", read=rdFILENAME, write=wrFILENAME_PACKED)
 
 
 def rdRegs(index):
@@ -488,25 +739,7 @@ def rdRegs(index):
     Returns:
         value: Value read (32-bit)
     """
-    global CONTROL, DEVICE, CHANNELS, SAMPLE_RATE, SAMPLE_BITS
-    value = 0
-
-    if   index == 0:
-        value = CONTROL
-    elif index == 1:
-        value = rdSTATUS()
-    elif index == 2:
-        value = DEVICE
-    elif index == 3:
-        value = rdFILENAME()
-    elif index == 4:
-        value = CHANNELS
-    elif index == 5:
-        value = SAMPLE_RATE
-    elif index == 6:
-        value = SAMPLE_BITS
-
-    return value
+    return Registers.rd[index]()
 
 
 def wrRegs(index, value):
@@ -520,21 +753,4 @@ def wrRegs(index, value):
     Returns:
         value: Value written (32-bit)
     """
-    global STATUS, CHANNELS, SAMPLE_RATE, SAMPLE_BITS
-
-    if   index == 0:
-        wrCONTROL(value)
-    elif index == 1:
-        value = STATUS
-    elif index == 2:
-        wrDEVICE(value)
-    elif index == 3:
-        wrFILENAME(value)
-    elif index == 4:
-        CHANNELS = value
-    elif index == 5:
-        SAMPLE_RATE = value
-    elif index == 6:
-        SAMPLE_BITS = value
-
-    return value
+    return Registers.wr[index](value)
@@ -18,15 +18,19 @@
 
 try:
     import argparse
+    import importlib
     import ipaddress
     import logging
-    import time
+    import math
+    import mmap
+    import threading
     import wave
     from multiprocessing.connection import Listener
     from pathlib import Path
+    from struct import unpack_from
 
-    import pyaudio
-    import numpy as np
+    from vsi_protocol import FLAG_EOS, FLAG_ERROR, sendMessage, recvMessage, packValues, unpackValues, unpackStrings
+    from vsi_protocol import reportAddress, removeStaleSocket
 except ImportError as err:
     raise SystemExit(f"VSI:Audio:Server:ImportError: {err}") from err
 except Exception as e:
@@ -48,6 +52,8 @@ logger.info("Verbosity level is set to " + level[verbosity])
 # Default Server configuration
 default_address       = ('127.0.0.1', 6001)
 default_authkey       = 'vsi_audio'
+default_buffer_time   = 1000    # ms
+default_read_timeout  = 1000    # ms
 
 # Supported file extensions
 supported_files  = ['wav']
@@ -56,6 +62,461 @@ supported_files  = ['wav']
 MODE_AUDIO_INPUT      = 0
 MODE_AUDIO_OUTPUT     = 1
 
+# Sample format
+FORMAT_PCM            = 0   # Integer PCM (8-bit unsigned, 16/24/32-bit signed)
+FORMAT_FLOAT          = 1   # IEEE 754 float (32-bit)
+
+# WAV file format tags
+WAVE_FORMAT_PCM        = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+# PyAudio and NumPy are imported by a background thread once the server listens for
+# connections, so that clients connect without waiting for the import
+pyaudio               = None
+np                    = None
+dependencies_lock     = threading.Lock()
+dependencies_thread   = None
+dependencies_ready    = {"numpy": threading.Event(), "pyaudio": threading.Event()}
+dependencies_error    = {}
+
+
+def _importDependencies():
+    """
+    Import NumPy and PyAudio (background thread).
+
+    Each dependency is imported on its own, so that a missing PyAudio does not affect
+    sample conversion and a missing NumPy does not affect microphone/speaker streaming.
+    """
+    global pyaudio, np
+
+    for name in dependencies_ready:
+        try:
+            module = importlib.import_module(name)
+            if name == "numpy":
+                np = module
+            else:
+                pyaudio = module
+            logger.info(f"_importDependencies: {name} imported")
+        except ImportError as err:
+            dependencies_error[name] = f"VSI:Audio:Server:ImportError: {err}"
+        except Exception as e:
+            dependencies_error[name] = f"VSI:Audio:Server:Exception: {type(e).__name__}: {e}"
+        finally:
+            dependencies_ready[name].set()
+
+def loadDependencies():
+    """
+    Start importing PyAudio and NumPy in a background thread, if not already started.
+
+    Commands which do not use PyAudio (such as SET_MODE and SET_FILENAME) are served while the
+    dependencies are imported. Commands which need them wait for the import in waitDependencies().
+    Returns:
+        None
+    """
+    global dependencies_thread
+
+    with dependencies_lock:
+        if dependencies_thread is None:
+            dependencies_thread = threading.Thread(target=_importDependencies, daemon=True)
+            dependencies_thread.start()
+
+def waitDependencies(name):
+    """
+    Wait until a dependency is imported.
+
+    Args:
+        name: Name of the dependency ("pyaudio" for microphone/speaker streaming,
+              "numpy" for sample conversion).
+    Returns:
+        None
+    Raises:
+        ImportError: If the dependency could not be imported.
+    """
+    loadDependencies()
+    dependencies_ready[name].wait()
+
+    if name in dependencies_error:
+        raise ImportError(dependencies_error[name])
+
+
+class AudioBuffer:
+    """Thread-safe circular byte buffer with a fixed capacity.
+
+    Used to pass audio data between the PyAudio stream callback thread and the server thread.
+    Data which does not fit into the buffer is dropped and counted as overrun. Reads wait on a
+    condition variable signaled by writes; reads which cannot be completed in time are padded
+    with silence and counted as underrun.
+    """
+    def __init__(self, capacity):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Buffer capacity in bytes.
+        Returns:
+            None
+        """
+        self.buffer    = bytearray(capacity)
+        self.capacity  = capacity
+        self.idx_get   = 0
+        self.count     = 0
+        self.overruns  = 0
+        self.underruns = 0
+        self.lock      = threading.Lock()
+        self.data_cond = threading.Condition(self.lock)
+
+    def __len__(self):
+        """Number of bytes available for reading."""
+        return self.count
+
+    def write(self, data):
+        """
+        Write data to the buffer.
+
+        Args:
+            data: Bytes-like object to write.
+        Returns:
+            n: Number of bytes written (less than len(data) on overrun).
+        """
+        data = memoryview(data).cast('B')
+
+        with self.lock:
+            n = min(len(data), self.capacity - self.count)
+            if n < len(data):
+                self.overruns += 1
+
+            idx_put = (self.idx_get + self.count) % self.capacity
+            first   = min(n, self.capacity - idx_put)
+            self.buffer[idx_put:idx_put + first] = data[:first]
+            self.buffer[:n - first] = data[first:n]
+            self.count += n
+
+            # Wake up reader waiting for data
+            self.data_cond.notify()
+
+        return n
+
+    def read(self, size, timeout=0):
+        """
+        Read data from the buffer.
+
+        Waits until `size` bytes are available or the timeout expires. If not enough data
+        is available, the available data is returned padded with silence (zeros).
+        Args:
+            size: Number of bytes to read.
+            timeout: Maximum time to wait for data in seconds (0 = do not wait).
+        Returns:
+            data: Bytearray of `size` bytes.
+        """
+        with self.data_cond:
+            if (self.count < size) and (timeout > 0):
+                self.data_cond.wait_for(lambda: self.count >= size, timeout)
+
+            n = min(size, self.count)
+            if n < size:
+                self.underruns += 1
+
+            data  = bytearray(size)
+            first = min(n, self.capacity - self.idx_get)
+            view  = memoryview(self.buffer)
+            data[:first] = view[self.idx_get:self.idx_get + first]
+            data[first:n] = view[:n - first]
+            view.release()
+
+            self.idx_get = (self.idx_get + n) % self.capacity
+            self.count  -= n
+
+        return data
+
+
+class WaveReader:
+    """Memory-mapped WAV file reader.
+
+    Parses the RIFF header once, memory-maps the file and returns audio data
+    as memoryview slices of the data chunk, without copying.
+    """
+    def __init__(self, file):
+        """
+        Open and memory-map a WAV file and parse its header.
+
+        Args:
+            file: Path of the WAV file.
+        Returns:
+            None
+        Raises:
+            ValueError: The file is not a valid WAV file.
+        """
+        with open(file, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+        try:
+            self.__parseHeader()
+        except Exception:
+            self.close()
+            raise
+
+        self.offset = self.data_start
+
+    def __parseHeader(self):
+        """Parse the RIFF header and locate the fmt and data chunks."""
+        if (len(self.map) < 12) or (self.map[0:4] != b'RIFF') or (self.map[8:12] != b'WAVE'):
+            raise ValueError("not a RIFF/WAVE file")
+
+        fmt_found  = False
+        data_found = False
+        pos = 12
+        while (pos + 8 <= len(self.map)) and not data_found:
+            chunk_id = self.map[pos:pos + 4]
+            chunk_size = unpack_from('<I', self.map, pos + 4)[0]
+            pos += 8
+
+            if chunk_id == b'fmt ':
+                self.format_tag, self.channels, self.sample_rate, _, self.block_align, self.sample_bits = \
+                    unpack_from('<HHIIHH', self.map, pos)
+                if (self.format_tag == 0xFFFE) and (chunk_size >= 26):
+                    # WAVE_FORMAT_EXTENSIBLE: format tag is the first field of the sub-format GUID
+                    self.format_tag = unpack_from('<H', self.map, pos + 24)[0]
+                fmt_found = True
+
+            elif chunk_id == b'data':
+                # Data size may be unset (streamed files), limit it to the file size
+                self.data_start = pos
+                self.data_end   = min(pos + chunk_size, len(self.map))
+                data_found = True
+
+            # Chunks are word aligned
+            pos += chunk_size + (chunk_size & 1)
+
+        if not (fmt_found and data_found):
+            raise ValueError("fmt or data chunk not found")
+
+        if self.format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+            raise ValueError(f"unsupported format tag 0x{self.format_tag:04X}")
+
+        # Read whole frames only
+        self.data_end -= (self.data_end - self.data_start) % self.block_align
+
+    def getnchannels(self):
+        """Number of audio channels."""
+        return self.channels
+
+    def getframerate(self):
+        """Sample rate in Hz."""
+        return self.sample_rate
+
+    def getsampwidth(self):
+        """Sample width in bytes."""
+        return self.block_align // self.channels
+
+    def getsampformat(self):
+        """Sample format (FORMAT_PCM or FORMAT_FLOAT)."""
+        return FORMAT_FLOAT if self.format_tag == WAVE_FORMAT_IEEE_FLOAT else FORMAT_PCM
+
+    def read(self, size):
+        """
+        Read audio data.
+
+        Args:
+            size: Number of bytes to read.
+        Returns:
+            tuple: (data, eos) where data is a memoryview of up to `size` bytes of the data chunk
+                   and eos is a Boolean indicating that the end of the data chunk has been reached.
+        """
+        start = self.offset
+        self.offset = min(start + size, self.data_end)
+
+        return self.view[start:self.offset], (self.offset >= self.data_end)
+
+    def close(self):
+        """Unmap the file."""
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # Data slices are still referenced, file is unmapped when the last slice is released
+            pass
+
+
+class AudioConverter:
+    """Converts audio data between sample formats, channel counts and sample rates.
+
+    Each block of audio data is decoded to float32 samples, mixed to the destination
+    number of channels, resampled with a polyphase FIR filter and encoded to the
+    destination sample format. All steps operate on whole blocks using NumPy.
+    Resampler state is kept between blocks, so consecutive blocks form a continuous stream.
+    """
+    TAPS = 16   # Resampling filter taps per polyphase branch
+
+    def __init__(self, src, dst):
+        """
+        Initialize the converter.
+
+        Args:
+            src: Source (channels, sample_rate, sample_bits, sample_format) tuple.
+            dst: Destination (channels, sample_rate, sample_bits, sample_format) tuple.
+        Returns:
+            None
+        Raises:
+            ValueError: Unsupported sample format.
+            ImportError: NumPy is not available.
+        """
+        waitDependencies("numpy")
+
+        self.src_channels, self.src_rate, self.src_bits, self.src_format = src
+        self.dst_channels, self.dst_rate, self.dst_bits, self.dst_format = dst
+
+        for bits, sample_format in ((self.src_bits, self.src_format), (self.dst_bits, self.dst_format)):
+            if (bits not in (8, 16, 24, 32)) or ((sample_format == FORMAT_FLOAT) and (bits != 32)):
+                raise ValueError(f"unsupported sample format ({bits} bits, format {sample_format})")
+
+        self.src_frame_size = self.src_channels * (self.src_bits // 8)
+        self.dst_frame_size = self.dst_channels * (self.dst_bits // 8)
+
+        # Channel mixing matrix (source channels x destination channels)
+        self.mix = None
+        if self.src_channels != self.dst_channels:
+            mix = np.zeros((self.src_channels, self.dst_channels), dtype=np.float32)
+            if self.dst_channels > self.src_channels:
+                # Up-mix: repeat source channels
+                for ch in range(self.dst_channels):
+                    mix[ch % self.src_channels, ch] = 1.0
+            else:
+                # Down-mix: average source channels
+                for ch in range(self.src_channels):
+                    mix[ch, ch % self.dst_channels] = 1.0
+                mix /= mix.sum(axis=0)
+            self.mix = mix
+
+        # Polyphase resampling filter (interpolate by up, decimate by down)
+        self.up   = 1
+        self.down = 1
+        if self.src_rate != self.dst_rate:
+            gcd = math.gcd(self.src_rate, self.dst_rate)
+            self.up   = self.dst_rate // gcd
+            self.down = self.src_rate // gcd
+
+            # Windowed-sinc low-pass filter at the lower of both Nyquist frequencies
+            n      = self.TAPS * self.up
+            cutoff = 1.0 / max(self.up, self.down)
+            t      = np.arange(n) - (n - 1) / 2
+            h      = self.up * cutoff * np.sinc(cutoff * t) * np.kaiser(n, 8.0)
+
+            # Branch p holds taps h[p + k*up] applied to input sample x[i - k]
+            self.branches = h.reshape(self.TAPS, self.up).T.astype(np.float32)
+            self.history  = np.zeros((self.TAPS - 1, min(self.src_channels, self.dst_channels)), dtype=np.float32)
+            self.position = 0
+
+    @property
+    def resampling(self):
+        """True if the sample rate is converted."""
+        return self.up != self.down
+
+    def inputSize(self, size):
+        """
+        Estimate the number of source bytes needed to produce `size` destination bytes.
+
+        Args:
+            size: Number of destination bytes.
+        Returns:
+            Number of source bytes (whole frames, at least one frame).
+        """
+        frames = -(-(size // self.dst_frame_size) * self.down // self.up)
+        return max(frames, 1) * self.src_frame_size
+
+    def convert(self, data):
+        """
+        Convert a block of audio data.
+
+        Args:
+            data: Bytes-like object holding whole source frames.
+        Returns:
+            Bytes of converted audio data.
+        """
+        x = self.__decode(data)
+
+        if (self.mix is not None) and (self.dst_channels < self.src_channels):
+            x = x @ self.mix
+        if self.resampling:
+            x = self.__resample(x)
+        if (self.mix is not None) and (self.dst_channels > self.src_channels):
+            x = x @ self.mix
+
+        return self.__encode(x)
+
+    def flush(self):
+        """
+        Flush samples held back by the resampling filter.
+
+        Returns:
+            Bytes of converted audio data.
+        """
+        if not self.resampling:
+            return b''
+
+        x = self.__resample(np.zeros((self.TAPS, self.history.shape[1]), dtype=np.float32))
+        if (self.mix is not None) and (self.dst_channels > self.src_channels):
+            x = x @ self.mix
+
+        return self.__encode(x)
+
+    def __decode(self, data):
+        """Decode source samples to float32 in range [-1.0, 1.0), shape (frames, channels)."""
+        if self.src_format == FORMAT_FLOAT:
+            x = np.frombuffer(data, dtype='<f4').astype(np.float32)
+        elif self.src_bits == 8:
+            x = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif self.src_bits == 16:
+            x = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        elif self.src_bits == 24:
+            b = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            x = ((v << 8) >> 8).astype(np.float32) / 8388608.0
+        else:
+            x = (np.frombuffer(data, dtype='<i4') / 2147483648.0).astype(np.float32)
+
+        return x.reshape(-1, self.src_channels)
+
+    def __encode(self, x):
+        """Encode float32 samples of shape (frames, channels) to destination sample format."""
+        x = x.reshape(-1)
+
+        if self.dst_format == FORMAT_FLOAT:
+            return x.astype('<f4').tobytes()
+
+        x = np.clip(x, -1.0, 1.0)
+        if self.dst_bits == 8:
+            y = np.clip(np.rint(x * 128.0) + 128.0, 0, 255).astype(np.uint8)
+        elif self.dst_bits == 16:
+            y = np.clip(np.rint(x * 32768.0), -32768, 32767).astype('<i2')
+        elif self.dst_bits == 24:
+            v = np.clip(np.rint(x * 8388608.0), -8388608, 8388607).astype('<i4')
+            y = v.view(np.uint8).reshape(-1, 4)[:, :3]
+        else:
+            y = np.clip(np.rint(x.astype(np.float64) * 2147483648.0), -2147483648, 2147483647).astype('<i4')
+
+        return y.tobytes()
+
+    def __resample(self, x):
+        """Resample float32 samples of shape (frames, channels), continuing from the previous block."""
+        frames = len(x)
+        xb = np.concatenate((self.history, x))
+
+        # Output sample positions on the upsampled time grid, relative to the block start
+        u = np.arange(self.position, frames * self.up, self.down)
+        i = u // self.up + (self.TAPS - 1)
+        p = u % self.up
+
+        # Gather TAPS input samples for every output sample and apply the matching branch
+        taps = xb[i[:, None] - np.arange(self.TAPS)[None, :]]
+        y = np.einsum('nk,nkc->nc', self.branches[p], taps)
+
+        self.position += len(u) * self.down - frames * self.up
+        self.history   = xb[len(xb) - (self.TAPS - 1):]
+
+        return y
+
+
 class AudioServer:
     """Implements a TCP server for audio streaming and sample I/O.
 
@@ -64,15 +525,17 @@ class AudioServer:
     enabling/disabling stream, reading/writing audio data), and performs the requested audio
     operations using PyAudio and wave modules.
     """
-    def __init__(self, address, authkey):
+    def __init__(self, address, authkey, buffer_time=default_buffer_time, read_timeout=default_read_timeout):
         """
         Initialize the AudioServer.
 
         Sets up command codes, audio format constants, and initializes all state variables.
         Creates a Listener object for incoming client connections.
         Args:
-            address: The (IP, port) tuple for the server to listen on.
+            address: The (IP, port) tuple or Unix domain socket path for the server to listen on.
             authkey: The authorization key for client connections.
+            buffer_time: Capacity of the microphone/speaker buffer in milliseconds of audio.
+            read_timeout: Maximum time in milliseconds to wait for microphone data on read.
         Returns:
             None
         """
@@ -96,14 +559,19 @@ class AudioServer:
         self.eos              = False
         self.stream           = None
         self.wave_file        = None
-        self.pyaudio_obj      = pyaudio.PyAudio()
-        self.audio_buffer     = bytearray()
+        self.converter        = None
+        self.convert_buffer   = bytearray()
+        self.pyaudio_obj      = None
+        self.audio_buffer     = None
+        self.buffer_time      = buffer_time
+        self.read_timeout     = read_timeout
         self.chunk_size       = 1024
 
         # Stream configuration
         self.channels         = None
         self.sample_rate      = None
         self.sample_bits      = None
+        self.sample_format    = FORMAT_PCM
 
     def _setMode(self, mode):
         """
@@ -221,7 +689,7 @@ class AudioServer:
 
         return filename_valid
 
-    def _configureStream(self, channels, sample_rate, sample_bits):
+    def _configureStream(self, channels, sample_rate, sample_bits, sample_format=FORMAT_PCM):
         """
         Configure the audio stream parameters.
 
@@ -229,10 +697,11 @@ class AudioServer:
             channels: The number of audio channels (1=mono, 2=stereo).
             sample_rate: The sample rate in Hz (8000, 16000, 44100, 48000).
             sample_bits: The bit depth (8, 16, 24, 32).
+            sample_format: The sample format (FORMAT_PCM=integer, FORMAT_FLOAT=32-bit float).
         Returns:
             configuration_valid: True if the configuration is valid and set, False otherwise.
         """
-        logger.debug(f"_configureStream: channels={channels}, sample_rate={sample_rate}, sample_bits={sample_bits}")
+        logger.debug(f"_configureStream: channels={channels}, sample_rate={sample_rate}, sample_bits={sample_bits}, sample_format={sample_format}")
 
         if channels <= 0 or sample_rate <= 0 or sample_bits <= 0:
             logger.error(f"_configureStream: invalid argument (channels={channels}, sample_rate={sample_rate}, sample_bits={sample_bits})")
@@ -242,17 +711,43 @@ class AudioServer:
             logger.error(f"_configureStream: unsupported sample_bits={sample_bits}")
             return False
 
+        if (sample_format not in [FORMAT_PCM, FORMAT_FLOAT]) or (sample_format == FORMAT_FLOAT and sample_bits != 32):
+            logger.error(f"_configureStream: unsupported sample_format={sample_format} for sample_bits={sample_bits}")
+            return False
+
         self.channels = channels
         self.sample_rate = sample_rate
         self.sample_bits = sample_bits
+        self.sample_format = sample_format
 
-        logger.info(f"_configureStream: stream configured to {self.channels} channels, {self.sample_rate}Hz, {self.sample_bits} bits")
+        format_name = "float" if sample_format == FORMAT_FLOAT else "PCM"
+        logger.info(f"_configureStream: stream configured to {self.channels} channels, {self.sample_rate}Hz, {self.sample_bits} bits {format_name}")
 
         return True
 
+    def _initPyAudio(self):
+        """
+        Create the PyAudio object used for microphone/speaker streaming, if not already created.
+
+        Returns:
+            True if the PyAudio object is available, False otherwise.
+        Raises:
+            ImportError: PyAudio is not available.
+        """
+        if self.pyaudio_obj is None:
+            waitDependencies("pyaudio")
+            try:
+                self.pyaudio_obj = pyaudio.PyAudio()
+            except Exception as e:
+                logger.error(f"_initPyAudio: failed to initialize PyAudio: {e}")
+
+        return self.pyaudio_obj is not None
+
     def _get_pyaudio_format(self):
-        """Get PyAudio format based on sample bits."""
-        if self.sample_bits == 8:
+        """Get PyAudio format based on sample bits and sample format."""
+        if self.sample_format == FORMAT_FLOAT:
+            return pyaudio.paFloat32
+        elif self.sample_bits == 8:
             return pyaudio.paUInt8
         elif self.sample_bits == 16:
             return pyaudio.paInt16
@@ -269,7 +764,7 @@ class AudioServer:
         Returns:
             Default device index for the current mode.
         """
-        if self.pyaudio_obj is None:
+        if not self._initPyAudio():
             logger.error(" _scan_audio_devices: PyAudio object is not initialized")
             return 0
 
@@ -348,7 +843,7 @@ class AudioServer:
         """
         logger.debug(f"_audio_callback_input: received {len(in_data)} bytes")
 
-        self.audio_buffer.extend(in_data)
+        self.audio_buffer.write(in_data)
         return (None, pyaudio.paContinue)
 
     def _audio_callback_output(self, in_data, frame_count, time_info, status):
@@ -358,12 +853,9 @@ class AudioServer:
         logger.debug(f"_audio_callback_output: requested {frame_count} frames")
 
         bytes_needed = frame_count * self.channels * (self.sample_bits // 8)
-        if len(self.audio_buffer) >= bytes_needed:
-            data = bytes(self.audio_buffer[:bytes_needed])
-            del self.audio_buffer[:bytes_needed]
-        else:
-            # Not enough data, return silence
-            data = b'\x00' * bytes_needed
+
+        # Missing data is replaced by silence
+        data = bytes(self.audio_buffer.read(bytes_needed))
         return (data, pyaudio.paContinue)
 
     def _enableStream(self):
@@ -373,18 +865,24 @@ class AudioServer:
         Initializes the PyAudio stream or wave file as needed.
         Returns:
             None
+        Raises:
+            ImportError: PyAudio (microphone/speakers) or NumPy (sample conversion) is not available.
         """
         if self.active:
             logger.info("_enableStream: stream already active")
             return
 
         self.eos = False
-        self.audio_buffer.clear()
+
+        # Microphone/speaker buffer holding buffer_time milliseconds of audio
+        frame_bytes = self.channels * (self.sample_bits // 8)
+        buffer_size = max((self.sample_rate * self.buffer_time) // 1000, 2 * self.chunk_size) * frame_bytes
+        self.audio_buffer = AudioBuffer(buffer_size)
 
         try:
             if self.filename == None:
                 # Use microphone/speakers
-                if self.pyaudio_obj is None:
+                if not self._initPyAudio():
                     logger.error("_enableStream: PyAudio object is not initialized")
                     return
 
@@ -424,21 +922,27 @@ class AudioServer:
 
                 logger.debug(f"_enableStream: use audio file: {file}")
 
+                stream_config = (self.channels, self.sample_rate, self.sample_bits, self.sample_format)
+
                 if self.mode == MODE_AUDIO_INPUT:
-                    self.wave_file = wave.open(file, 'rb')
+                    self.wave_file = WaveReader(file)
 
-                    # Verify file properties match configuration
-                    file_channels = self.wave_file.getnchannels()
-                    file_rate = self.wave_file.getframerate()
-                    file_bits = self.wave_file.getsampwidth() * 8
+                    file_config = (self.wave_file.getnchannels(), self.wave_file.getframerate(),
+                                   self.wave_file.getsampwidth() * 8, self.wave_file.getsampformat())
 
-                    if (file_channels != self.channels or file_rate != self.sample_rate or file_bits != self.sample_bits):
-                        logger.warning(f"_enableStream: file properties ({file_channels}ch, {file_rate}Hz, {file_bits}bit) "
-                                     f"don't match configured ({self.channels}ch, {self.sample_rate}Hz, {self.sample_bits}bit)")
+                    logger.info(f"_enableStream: input file properties: channels={file_config[0]}, rate={file_config[1]}, bits={file_config[2]}, format={file_config[3]}")
 
-                    logger.info(f"_enableStream: input file properties: channels={file_channels}, rate={file_rate}, bits={file_bits}")
+                    # Convert file data to the configured stream format
+                    if file_config != stream_config:
+                        self.converter = AudioConverter(file_config, stream_config)
+                        logger.info(f"_enableStream: converting {file_config[0]}ch/{file_config[1]}Hz/{file_config[2]}bit "
+                                    f"to {self.channels}ch/{self.sample_rate}Hz/{self.sample_bits}bit")
 
                 if self.mode == MODE_AUDIO_OUTPUT:
+                    # WAV files are written as integer PCM, float streams are converted to 32-bit PCM
+                    if self.sample_format == FORMAT_FLOAT:
+                        self.converter = AudioConverter(stream_config, (self.channels, self.sample_rate, 32, FORMAT_PCM))
+
                     self.wave_file = wave.open(file, 'wb')
                     self.wave_file.setnchannels(self.channels)
                     self.wave_file.setsampwidth(self.sample_bits // 8)
@@ -449,6 +953,10 @@ class AudioServer:
             self.active = True
             logger.info("_enableStream: stream enabled")
 
+        except ImportError:
+            self._disableStream()
+            raise
+
         except Exception as e:
             logger.error(f"_enableStream: failed to enable stream: {e}")
             self._disableStream()
@@ -469,6 +977,9 @@ class AudioServer:
                 self.stream.close()
                 self.stream = None
 
+                if self.audio_buffer.overruns or self.audio_buffer.underruns:
+                    logger.warning(f"_disableStream: audio buffer overruns={self.audio_buffer.overruns}, underruns={self.audio_buffer.underruns}")
+
             if self.pyaudio_obj is not None:
                 self.pyaudio_obj.terminate()
                 self.pyaudio_obj = None
@@ -477,6 +988,9 @@ class AudioServer:
                 self.wave_file.close()
                 self.wave_file = None
 
+            self.converter = None
+            self.convert_buffer = bytearray()
+
         except Exception as e:
             logger.error(f"_disableStream: error during cleanup: {e}")
 
@@ -489,7 +1003,7 @@ class AudioServer:
         Args:
             size: Number of bytes to read.
         Returns:
-            audio_data: The read audio data as a bytearray, or empty if no data is available.
+            audio_data: The read audio data as a bytes-like object, or empty if no data is available.
         """
         logger.debug(f"_readAudio: size={size} bytes")
 
@@ -506,26 +1020,39 @@ class AudioServer:
         try:
             if self.filename == None:
                 # Read from microphone buffer
-                while len(self.audio_buffer) < size:
-                    # Wait for enough data
-                    time.sleep(0.01)  # Wait 10ms
+                if size > self.audio_buffer.capacity:
+                    logger.error(f"_readAudio: size={size} exceeds audio buffer capacity={self.audio_buffer.capacity}")
+                    return audio_data
 
-                # Now we have enough data
-                audio_data = bytearray(self.audio_buffer[:size])
-                del self.audio_buffer[:size]
+                # Wait for enough data, missing data after timeout is replaced by silence
+                audio_data = self.audio_buffer.read(size, self.read_timeout / 1000)
 
                 logger.debug(f"_readAudio: read {len(audio_data)} bytes from microphone buffer")
 
+            elif self.converter is not None:
+                # Read and convert blocks of wave file data until a block of `size` bytes is available
+                frame_size = self.converter.dst_frame_size
+                size = (size // frame_size) * frame_size
+                file_eos = (self.wave_file.offset >= self.wave_file.data_end)
+
+                while (len(self.convert_buffer) < size) and not file_eos:
+                    file_data, file_eos = self.wave_file.read(self.converter.inputSize(size - len(self.convert_buffer)))
+                    self.convert_buffer += self.converter.convert(file_data)
+                    if file_eos:
+                        self.convert_buffer += self.converter.flush()
+
+                audio_data = self.convert_buffer[:size]
+                del self.convert_buffer[:size]
+                self.eos = file_eos and (len(self.convert_buffer) == 0)
+                logger.debug(f"_readAudio: read {len(audio_data)} bytes from file (converted)")
+
             else:
-                # Read from wave file
-                frames_to_read = size // (self.channels * (self.sample_bits // 8))
-                frames_data = self.wave_file.readframes(frames_to_read)
+                # Read whole frames from wave file
+                frame_size = self.wave_file.block_align
+                audio_data, self.eos = self.wave_file.read((size // frame_size) * frame_size)
+                logger.debug(f"_readAudio: read {len(audio_data)} bytes from file")
 
-                if len(frames_data) > 0:
-                    audio_data = bytearray(frames_data)
-                    logger.debug(f"_readAudio: read {len(audio_data)} bytes from file")
-                else:
-                    self.eos = True
+                if self.eos:
                     logger.debug("_readAudio: end of file reached")
 
         except Exception as e:
@@ -538,7 +1065,7 @@ class AudioServer:
         Write audio data to the output destination (file or speakers).
 
         Args:
-            data: The input audio data as a bytearray to be written.
+            data: The input audio data as a bytes-like object to be written.
         Returns:
             None
         """
@@ -551,11 +1078,16 @@ class AudioServer:
         try:
             if self.filename == None:
                 # Write to speakers buffer
-                self.audio_buffer.extend(data)
-                logger.debug("_writeAudio: added data to speaker buffer")
+                n = self.audio_buffer.write(data)
+                if n < len(data):
+                    logger.debug(f"_writeAudio: speaker buffer overrun, {len(data) - n} bytes dropped")
+                else:
+                    logger.debug("_writeAudio: added data to speaker buffer")
 
             else:
                 # Write to wave file
+                if self.converter is not None:
+                    data = self.converter.convert(data)
                 self.wave_file.writeframes(data)
                 logger.debug("_writeAudio: wrote data to file")
 
@@ -581,49 +1113,62 @@ class AudioServer:
 
         while True:
             try:
-                recv = conn.recv()
+                cmd, flags, seq, payload = recvMessage(conn)
             except EOFError:
                 return
+            except ValueError as e:
+                logger.error(f"run: invalid message: {e}")
+                return
+
+            try:
+                if   cmd == self.SET_MODE:
+                    current_mode = self._setMode(unpackValues(payload)[0])
+                    sendMessage(conn, cmd, seq, packValues(current_mode))
 
-            cmd     = recv[0]  # Command
-            payload = recv[1:] # Payload
+                elif cmd == self.SET_DEVICE:
+                    device_valid = self._setDevice(unpackValues(payload)[0])
+                    sendMessage(conn, cmd, seq, packValues(device_valid))
 
-            if   cmd == self.SET_MODE:
-                current_mode = self._setMode(payload[0])
-                conn.send(current_mode)
+                elif cmd == self.SET_FILENAME:
+                    base_dir, filename = unpackStrings(payload)
+                    filename_valid = self._setFilename(base_dir, filename)
+                    sendMessage(conn, cmd, seq, packValues(filename_valid))
 
-            elif cmd == self.SET_DEVICE:
-                device_valid = self._setDevice(payload[0])
-                conn.send(device_valid)
+                elif cmd == self.STREAM_CONFIGURE:
+                    configuration_valid = self._configureStream(*unpackValues(payload))
+                    sendMessage(conn, cmd, seq, packValues(configuration_valid))
 
-            elif cmd == self.SET_FILENAME:
-                filename_valid = self._setFilename(payload[0], payload[1])
-                conn.send(filename_valid)
+                elif cmd == self.STREAM_ENABLE:
+                    self._enableStream()
+                    sendMessage(conn, cmd, seq, packValues(self.active))
 
-            elif cmd == self.STREAM_CONFIGURE:
-                configuration_valid = self._configureStream(payload[0], payload[1], payload[2])
-                conn.send(configuration_valid)
+                elif cmd == self.STREAM_DISABLE:
+                    self._disableStream()
+                    sendMessage(conn, cmd, seq, packValues(self.active))
 
-            elif cmd == self.STREAM_ENABLE:
-                self._enableStream()
-                conn.send(self.active)
+                elif cmd == self.AUDIO_READ:
+                    size = unpackValues(payload)[0]
+                    audio_data = self._readAudio(size)
+                    sendMessage(conn, cmd, seq, audio_data, FLAG_EOS if self.eos else 0)
 
-            elif cmd == self.STREAM_DISABLE:
-                self._disableStream()
-                conn.send(self.active)
+                elif cmd == self.AUDIO_WRITE:
+                    # Audio data is carried in the command message
+                    self._writeAudio(payload)
 
-            elif cmd == self.AUDIO_READ:
-                size = payload[0]
-                audio_data = self._readAudio(size)
-                conn.send_bytes(audio_data)
-                conn.send(self.eos)
+                elif cmd == self.CLOSE_SERVER:
+                    self.stop()
 
-            elif cmd == self.AUDIO_WRITE:
-                audio_data = conn.recv_bytes()
-                self._writeAudio(audio_data)
+            except (BrokenPipeError, ConnectionResetError, EOFError):
+                # Client closed the connection before taking the reply, end of session
+                return
 
-            elif cmd == self.CLOSE_SERVER:
-                self.stop()
+            except ImportError as e:
+                # PyAudio or NumPy not available: fail the command, keep serving
+                logger.error(f"run: {e}")
+                if cmd == self.AUDIO_READ:
+                    sendMessage(conn, cmd, seq, b'', FLAG_EOS | FLAG_ERROR)
+                elif cmd != self.AUDIO_WRITE:
+                    sendMessage(conn, cmd, seq, packValues(0), FLAG_ERROR)
 
 
     def stop(self):
@@ -655,7 +1200,8 @@ def ip(ip):
 
 def parse_arguments():
     """
-    Parse command-line arguments for the audio server (IP, port, authkey).
+    Parse command-line arguments for the audio server (IP, port, Unix domain socket, authkey, address report,
+    buffer time, read timeout).
     Returns:
         args: The parsed command-line arguments.
     """
@@ -669,15 +1215,38 @@ def parse_arguments():
     parser_optional.add_argument("--port", dest="port",  metavar="<TCP Port>",
                                         help=f"TCP port (default: {default_address[1]})",
                                         type=int, default=default_address[1])
+    parser_optional.add_argument("--unix", dest="unix",  metavar="<Path>",
+                                        help="Unix domain socket path, used instead of IP address and port (default: TCP)",
+                                        type=str, default=None)
     parser_optional.add_argument("--authkey", dest="authkey",  metavar="<Auth Key>",
                                         help=f"Authorization key (default: {default_authkey})",
                                         type=str, default=default_authkey)
+    parser_optional.add_argument("--report", dest="report",
+                                        help="Report the bound server address on standard output (for --port 0)",
+                                        action="store_true")
+    parser_optional.add_argument("--buffer-time", dest="buffer_time",  metavar="<ms>",
+                                        help=f"Microphone/speaker buffer capacity in ms (default: {default_buffer_time})",
+                                        type=int, default=default_buffer_time)
+    parser_optional.add_argument("--read-timeout", dest="read_timeout",  metavar="<ms>",
+                                        help=f"Microphone read timeout in ms (default: {default_read_timeout})",
+                                        type=int, default=default_read_timeout)
 
     return parser.parse_args()
 
 if __name__ == '__main__':
     args = parse_arguments()
-    Server = AudioServer((args.ip, args.port), args.authkey)
+    if args.unix is not None:
+        address = args.unix
+        # Remove the socket file left behind by a server which did not exit cleanly
+        if not removeStaleSocket(address):
+            raise SystemExit(f"VSI:Audio:Server: server already listening on {address}")
+    else:
+        address = (args.ip, args.port)
+    Server = AudioServer(address, args.authkey, args.buffer_time, args.read_timeout)
+    if args.report:
+        reportAddress(Server.listener.address)
+    # Listener is bound, import PyAudio while waiting for the client
+    loadDependencies()
     try:
         Server.run()
     except KeyboardInterrupt:
@@ -0,0 +1,124 @@
+# Copyright (c) 2026 Arm Limited. All rights reserved.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the License); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Python VSI Register Map module
+# This module provides a table-driven user register map for VSI peripheral client modules.
+# Registers are declared once with their read/write handlers and bit fields, register
+# accesses dispatch to the handler by indexing a list.
+
+# Number of VSI user registers
+REGS_COUNT = 64
+
+# Handler marker for read-only registers (writes return the current value)
+READ_ONLY = object()
+
+
+class RegisterMap:
+    """
+    User register map of a VSI peripheral.
+
+    Register values are held in the client module namespace, in variables named after
+    the registers. Each register has a read handler and a write handler stored in lists
+    indexed by the register index. Unused registers read as 0 and ignore writes.
+    """
+    def __init__(self, namespace):
+        """
+        Initialize an empty register map.
+
+        Args:
+            namespace: Client module namespace (`globals()`) holding the register variables.
+        Returns:
+            None
+        """
+        self.namespace = namespace
+        self.names     = [None] * REGS_COUNT
+        self.fields    = [{}] * REGS_COUNT
+        self.rd        = [lambda: 0] * REGS_COUNT
+        self.wr        = [lambda value: value] * REGS_COUNT
+
+    def register(self, index, name, read=None, write=None, fields=None):
+        """
+        Declare a user register.
+
+        Args:
+            index: User register index (zero based).
+            name: Register name, also the name of the register variable in the module namespace.
+            read: Read handler `read()` returning the register value (None = return the register variable).
+            write: Write handler `write(value)` returning the value written (None = set the register
+                   variable, READ_ONLY = ignore the write and return the register variable).
+            fields: Dictionary of bit field names and masks of the register, used to decode values.
+        Returns:
+            None
+        """
+        namespace = self.namespace
+
+        if read is None:
+            read = lambda: namespace[name]
+
+        if write is None:
+            def write(value):
+                namespace[name] = value
+                return value
+        elif write is READ_ONLY:
+            write = lambda value: namespace[name]
+
+        self.names[index]  = name
+        self.fields[index] = fields or {}
+        self.rd[index]     = read
+        self.wr[index]     = write
+
+    def read(self, index):
+        """
+        Read a user register.
+
+        Args:
+            index: User register index (zero based).
+        Returns:
+            value: Value read (32-bit).
+        """
+        return self.rd[index]()
+
+    def write(self, index, value):
+        """
+        Write a user register.
+
+        Args:
+            index: User register index (zero based).
+            value: Value to write (32-bit).
+        Returns:
+            value: Value written (32-bit).
+        """
+        return self.wr[index](value)
+
+    def decode(self, index, value):
+        """
+        Format a register value with its bit fields, for logging.
+
+        Args:
+            index: User register index (zero based).
+            value: Register value.
+        Returns:
+            String like `CONTROL=0x00000005 (ENABLE|CONTINUOUS)`.
+        """
+        name = self.names[index] or f"Regs[{index}]"
+        if not isinstance(value, int):
+            return f"{name}={value}"
+
+        text = f"{name}=0x{value:08X}"
+        fields = [field for field, mask in self.fields[index].items() if value & mask]
+        if fields:
+            text += f" ({'|'.join(fields)})"
+        return text
@@ -0,0 +1,256 @@
+# Copyright (c) 2026 Arm Limited. All rights reserved.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the License); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Python VSI Protocol module
+# This module implements the binary message format used between the vStream clients
+# (vsi_audio, vsi_video) and servers (vsi_audio_server, vsi_video_server).
+# Each command and reply starts with a fixed header (opcode, flags, payload length and sequence
+# number). Small payloads follow the header in the same connection message, large payloads
+# (stream data) are sent as a second connection message, so that they are not copied.
+# Integer arguments and results are packed as 64-bit signed integers, strings are UTF-8 encoded
+# and separated by null characters, and stream data is carried as raw bytes.
+# The module also resolves the configured server address to a TCP or Unix domain socket address,
+# and transfers the address bound by a started server back to the client.
+
+try:
+    import os
+    import socket
+    import struct
+    import sys
+    import tempfile
+    from multiprocessing.connection import families
+except ImportError as err:
+    print(f"VSI:Protocol:ImportError: {err}")
+    raise
+except Exception as e:
+    print(f"VSI:Protocol:Exception: {type(e).__name__}")
+    raise
+
+# Message header: opcode, flags, payload length, sequence number (little-endian)
+HEADER      = struct.Struct('<HHII')
+HEADER_SIZE = HEADER.size
+
+# Payloads up to this size are sent in the header message, larger payloads in a separate message
+INLINE_SIZE = 16384
+
+# Header flags
+FLAG_EOS    = 1<<0    # End of stream (stream data replies)
+FLAG_ERROR  = 1<<1    # Command failed on the server (dependency not available)
+
+# Sequence number mask (sequence numbers wrap at 32 bits)
+SEQ_MASK    = 0xFFFFFFFF
+
+# Server address host selecting a Unix domain socket ('unix', port)
+UNIX_HOST   = 'unix'
+
+# Unix domain sockets are supported by the platform (not on Windows)
+UNIX_SUPPORTED = 'AF_UNIX' in families
+
+
+def serverAddress(address, shared=False):
+    """
+    Resolve the configured server address to a connection address.
+
+    The host 'unix' selects a Unix domain socket. The socket path is derived from the port and
+    the process ID, so that simulations running in parallel use separate sockets. A server shared
+    between simulations uses a path without the process ID. If Unix domain sockets are not
+    supported, the TCP port on the local host is used instead.
+    Args:
+        address: Tuple (IP, port) for TCP, or ('unix', port) for a Unix domain socket.
+        shared: The server is shared between simulations.
+    Returns:
+        Tuple (IP, port) for TCP, or Unix domain socket path (str).
+    """
+    host, port = address
+    if host != UNIX_HOST:
+        return address
+    if not UNIX_SUPPORTED:
+        return ('127.0.0.1', port)
+
+    if shared:
+        name = f"vsi-{port}.sock"
+    else:
+        name = f"vsi-{os.getpid()}-{port}.sock"
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def removeStaleSocket(path):
+    """
+    Remove a Unix domain socket file left behind by a server which did not exit cleanly.
+
+    The file is removed only if connecting to it is refused, so that the socket of a server
+    which is still listening (such as a shared video server daemon) is kept.
+    Args:
+        path: Unix domain socket path.
+    Returns:
+        True if the path is free to bind, False if a server is listening on it.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except FileNotFoundError:
+        return True
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return True
+    finally:
+        sock.close()
+    return False
+
+
+def reportAddress(address):
+    """
+    Report the bound server address to the client which started the server.
+
+    The address is written as one line ('IP:port' or Unix domain socket path) to the standard
+    output, which the client reads through a pipe. The standard output is then redirected to
+    the null device, so that the client sees the end of the pipe.
+    Args:
+        address: Address of the server listener (tuple (IP, port) or Unix domain socket path).
+    Returns:
+        None
+    """
+    if isinstance(address, tuple):
+        address = f"{address[0]}:{address[1]}"
+    sys.stdout.write(f"{address}\n")
+    sys.stdout.flush()
+
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, sys.stdout.fileno())
+    os.close(null)
+
+
+def readAddress(pipe, address):
+    """
+    Read the server address reported by a started server (see reportAddress).
+
+    Args:
+        pipe: Standard output pipe of the server process.
+        address: Address requested from the server (tuple (IP, port) or Unix domain socket path).
+    Returns:
+        Address bound by the server, or None if the server exited without reporting it.
+    """
+    line = pipe.readline().decode('utf-8').strip()
+    pipe.close()
+    if not line:
+        return None
+
+    if isinstance(address, tuple):
+        host, _, port = line.rpartition(':')
+        return (host, int(port))
+    return line
+
+
+def sendMessage(conn, opcode, seq, payload=b'', flags=0):
+    """
+    Send a message.
+
+    A payload larger than INLINE_SIZE is sent as a separate connection message following the
+    header, so that it is passed to the connection without being copied.
+    Args:
+        conn: Connection to send the message on.
+        opcode: Command code.
+        seq: Sequence number (a reply carries the sequence number of its command).
+        payload: Message payload (bytes-like object).
+        flags: Header flags.
+    Returns:
+        None
+    """
+    payload = memoryview(payload).cast('B')
+    header  = HEADER.pack(opcode, flags, payload.nbytes, seq)
+    if payload.nbytes <= INLINE_SIZE:
+        conn.send_bytes(header + payload)
+    else:
+        conn.send_bytes(header)
+        conn.send_bytes(payload)
+
+
+def recvMessage(conn):
+    """
+    Receive a message.
+
+    Args:
+        conn: Connection to receive the message from.
+    Returns:
+        Tuple (opcode, flags, seq, payload), payload is a memoryview of the message payload.
+    Raises:
+        EOFError: If the connection is closed.
+        ValueError: If the message is malformed.
+    """
+    message = conn.recv_bytes()
+    if len(message) < HEADER_SIZE:
+        raise ValueError(f"message too short ({len(message)} bytes)")
+
+    opcode, flags, length, seq = HEADER.unpack_from(message)
+    if (length > INLINE_SIZE) and (len(message) == HEADER_SIZE):
+        # Payload sent as a separate message
+        payload = conn.recv_bytes()
+        if length != len(payload):
+            raise ValueError(f"payload length {length} does not match payload message size {len(payload)}")
+        return opcode, flags, seq, memoryview(payload)
+
+    if length != len(message) - HEADER_SIZE:
+        raise ValueError(f"payload length {length} does not match message size {len(message)}")
+
+    return opcode, flags, seq, memoryview(message)[HEADER_SIZE:]
+
+
+def packValues(*values):
+    """
+    Pack integer values into a payload.
+
+    Args:
+        values: Integer values (booleans are packed as 0 and 1).
+    Returns:
+        Payload (bytes).
+    """
+    return struct.pack(f'<{len(values)}q', *values)
+
+
+def unpackValues(payload):
+    """
+    Unpack integer values from a payload.
+
+    Args:
+        payload: Payload packed with packValues (bytes-like object).
+    Returns:
+        Tuple of integer values.
+    """
+    return struct.unpack(f'<{len(payload) // 8}q', payload)
+
+
+def packStrings(*strings):
+    """
+    Pack strings into a payload.
+
+    Args:
+        strings: Strings (without null characters).
+    Returns:
+        Payload (bytes).
+    """
+    return '\0'.join(strings).encode('utf-8')
+
+
+def unpackStrings(payload):
+    """
+    Unpack strings from a payload.
+
+    Args:
+        payload: Payload packed with packStrings (bytes-like object).
+    Returns:
+        List of strings.
+    """
+    return bytes(payload).decode('utf-8').split('\0')
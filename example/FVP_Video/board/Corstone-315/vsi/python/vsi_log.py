@@ -0,0 +1,267 @@
+# Copyright (c) 2026 Arm Limited. All rights reserved.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the License); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Python VSI logging module
+# VSI peripheral handlers (register access, DMA and timer callbacks) are called by the
+# simulation for every register access. Logging calls in these handlers format their
+# messages even when the message is discarded by the verbosity level.
+# This module recompiles module-level functions without the logging calls which are
+# disabled by the verbosity level, so disabled logging has no cost at run time. Classes
+# shared by users with different verbosity levels get a recompiled subclass per level.
+
+try:
+    import ast
+    import logging
+    import os
+    import sys
+    import types
+except ImportError as err:
+    print(f"VSI:Log:ImportError: {err}")
+    raise
+except Exception as e:
+    print(f"VSI:Log:Exception: {type(e).__name__}")
+    raise
+
+# Environment variable overriding the verbosity level set in the VSI Python scripts
+# (DEBUG, INFO, WARNING or ERROR)
+ENV_LOG_LEVEL = 'VSI_LOG_LEVEL'
+
+# Supported verbosity levels
+levels = { "DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR }
+
+# Logger methods and their levels
+log_methods = {
+    'debug':     logging.DEBUG,
+    'info':      logging.INFO,
+    'warning':   logging.WARNING,
+    'warn':      logging.WARNING,
+    'error':     logging.ERROR,
+    'exception': logging.ERROR,
+    'critical':  logging.CRITICAL
+}
+
+
+def getVerbosity(verbosity):
+    """
+    Get the verbosity level, overridden by the VSI_LOG_LEVEL environment variable if set.
+
+    Args:
+        verbosity: Default verbosity level (logging level).
+    Returns:
+        Verbosity level (logging level).
+    """
+    value = os.environ.get(ENV_LOG_LEVEL, '').strip().upper()
+
+    return levels.get(value, verbosity)
+
+
+def _isLogger(node):
+    """Check if `node` is the expression `logger` or `self.logger`."""
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and (node.value.id == 'self'):
+        return node.attr == 'logger'
+    return isinstance(node, ast.Name) and (node.id == 'logger')
+
+
+class _LogCallRemover(ast.NodeTransformer):
+    """Removes `logger.<method>(...)` and `self.logger.<method>(...)` statements below the verbosity level from a syntax tree."""
+    def __init__(self, verbosity):
+        self.verbosity = verbosity
+        self.removed   = 0
+
+    def visit_Expr(self, node):
+        call = node.value
+        if (isinstance(call, ast.Call) and
+            isinstance(call.func, ast.Attribute) and
+            _isLogger(call.func.value) and
+            (log_methods.get(call.func.attr, logging.CRITICAL) < self.verbosity)):
+            self.removed += 1
+            return None
+        return node
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+
+        # Keep statement blocks which consisted of logging calls only valid
+        body = getattr(node, 'body', None)
+        if isinstance(body, list) and (len(body) == 0):
+            body.append(ast.Pass())
+        if isinstance(node, ast.Try) and (len(node.handlers) == 0) and (len(node.finalbody) == 0):
+            node.finalbody.append(ast.Pass())
+        return node
+
+
+def _codeOf(code, name):
+    """Find the code object of function or class `name` in the constants of `code`."""
+    return next((c for c in code.co_consts if isinstance(c, types.CodeType) and (c.co_name == name)), None)
+
+
+def _replaceCode(function, code, original):
+    """Replace the code of `function` in place and keep its original code, return False if it is not a compatible function."""
+    function = getattr(function, '__func__', function)
+    if (not isinstance(function, types.FunctionType) or (code is None) or
+        (function.__code__.co_freevars != code.co_freevars)):
+        return False
+    original.setdefault(function, function.__code__)
+    function.__code__ = code
+    return True
+
+
+def _restore(namespace):
+    """Restore the functions recompiled by optimize in `namespace` to their original code."""
+    original = namespace.get('__vsi_log_original__', {})
+    for key, value in original.items():
+        if isinstance(key, str):
+            # Function which was redefined in the namespace
+            namespace[key] = value
+        else:
+            key.__code__ = value
+    original.clear()
+
+
+def optimize(namespace, verbosity):
+    """
+    Recompile module-level functions and class methods without logging calls below the verbosity level.
+
+    Functions are recompiled from the module source file and their code is replaced in
+    place, so references to the functions held elsewhere (such as register handler
+    tables or bound methods) use the recompiled code as well. Module-level statements
+    are not changed. If the source is not available, the functions are left unchanged.
+
+    A module optimized by several users (such as a client module shared by VSI channels)
+    keeps the logging calls of the lowest verbosity level requested, and the level of the
+    module logger is set to it. The original code is kept, so that logging calls removed
+    for a higher level are restored when a lower level is requested.
+    Args:
+        namespace: Module namespace (`globals()` of the module or `vars(module)`).
+        verbosity: Verbosity level (logging level), calls below this level are removed.
+    Returns:
+        Number of logging calls removed.
+    """
+    users = namespace.setdefault('__vsi_log_users__', [])
+    users.append(verbosity)
+    verbosity = max(min(users), logging.DEBUG)
+
+    logger = namespace.get('logger')
+    if isinstance(logger, logging.Logger):
+        logger.setLevel(verbosity)
+
+    if namespace.get('__vsi_log_verbosity__', logging.DEBUG) == verbosity:
+        return 0
+
+    # Start from the original code, the functions are recompiled for the new level
+    _restore(namespace)
+    namespace['__vsi_log_verbosity__'] = verbosity
+    if verbosity <= logging.DEBUG:
+        return 0
+
+    try:
+        file = namespace['__file__']
+        with open(file, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), file)
+    except Exception:
+        return 0
+
+    original = namespace.setdefault('__vsi_log_original__', {})
+    remover = _LogCallRemover(verbosity)
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            continue
+
+        removed = remover.removed
+        node = remover.visit(node)
+        if remover.removed == removed:
+            continue
+
+        module = ast.fix_missing_locations(ast.Module(body=[node], type_ignores=[]))
+        code = _codeOf(compile(module, file, 'exec'), node.name)
+
+        if isinstance(node, ast.FunctionDef):
+            if not _replaceCode(namespace.get(node.name), code, original):
+                original.setdefault(node.name, namespace.get(node.name))
+                exec(compile(module, file, 'exec'), namespace)
+        else:
+            cls = namespace.get(node.name)
+            for method in node.body:
+                if isinstance(method, ast.FunctionDef) and isinstance(cls, type):
+                    name = method.name
+                    if name.startswith('__') and not name.endswith('__'):
+                        # Private method, name is mangled in the class dictionary
+                        name = f"_{cls.__name__.lstrip('_')}{name}"
+                    _replaceCode(cls.__dict__.get(name), _codeOf(code, method.name), original)
+
+    return remover.removed
+
+
+# Classes recompiled by optimizeClass, by class and verbosity level
+_optimized_classes = {}
+
+
+def optimizeClass(cls, verbosity):
+    """
+    Get a subclass of `cls` with its methods recompiled without logging calls below the verbosity level.
+
+    Unlike optimize, the class itself is not changed, so that instances using different verbosity
+    levels (such as the VSI channels sharing the runtime module) each keep their own logging.
+    Subclasses are created once per verbosity level. If the source is not available or no logging
+    call is removed, `cls` is returned.
+    Args:
+        cls: Class defined at module level.
+        verbosity: Verbosity level (logging level), calls below this level are removed.
+    Returns:
+        Class to use for instances with the verbosity level.
+    """
+    if verbosity <= logging.DEBUG:
+        return cls
+    key = (cls, verbosity)
+    if key in _optimized_classes:
+        return _optimized_classes[key]
+
+    optimized = cls
+    try:
+        namespace = vars(sys.modules[cls.__module__])
+        file = namespace['__file__']
+        with open(file, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), file)
+        node = next(n for n in tree.body if isinstance(n, ast.ClassDef) and (n.name == cls.__name__))
+    except Exception:
+        node = None
+
+    if node is not None:
+        remover = _LogCallRemover(verbosity)
+        node = remover.visit(node)
+        if remover.removed != 0:
+            module = ast.fix_missing_locations(ast.Module(body=[node], type_ignores=[]))
+            code = _codeOf(compile(module, file, 'exec'), node.name)
+            methods = {}
+            for method in node.body:
+                if not isinstance(method, ast.FunctionDef):
+                    continue
+                name = method.name
+                if name.startswith('__') and not name.endswith('__'):
+                    # Private method, name is mangled in the class dictionary
+                    name = f"_{cls.__name__.lstrip('_')}{name}"
+                function = cls.__dict__.get(name)
+                method_code = _codeOf(code, method.name)
+                if (isinstance(function, types.FunctionType) and (method_code is not None) and
+                    (function.__code__.co_freevars == method_code.co_freevars == ())):
+                    methods[name] = types.FunctionType(method_code, namespace, method.name, function.__defaults__)
+                    methods[name].__kwdefaults__ = function.__kwdefaults__
+            optimized = type(cls.__name__, (cls,), dict(methods, __module__=cls.__module__,
+                                                        __qualname__=cls.__qualname__))
+
+    _optimized_classes[key] = optimized
+
+    return optimized
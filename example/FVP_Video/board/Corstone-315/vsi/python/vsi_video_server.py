@@ -18,13 +18,21 @@
 
 try:
     import argparse
+    import hashlib
     import ipaddress
     import logging
+    import math
+    import mmap
+    import os
+    import queue
+    import threading
+    import time
+    from multiprocessing import shared_memory
     from multiprocessing.connection import Listener
     from pathlib import Path
 
-    import cv2
-    import numpy as np
+    from vsi_protocol import FLAG_EOS, FLAG_ERROR, sendMessage, recvMessage, packValues, unpackValues, packStrings, unpackStrings
+    from vsi_protocol import reportAddress, removeStaleSocket
 except ImportError as err:
     raise SystemExit(f"VSI:Video:Server:ImportError: {err}") from err
 except Exception as e:
@@ -46,6 +54,13 @@ logger.info("Verbosity level is set to " + level[verbosity])
 # Default Server configuration
 default_address       = ('127.0.0.1', 6000)
 default_authkey       = 'vsi_video'
+default_prefetch      = 0
+default_encode_queue  = 4
+default_interpolation = 'linear'
+
+# Resize interpolation modes (nearest: fastest, area: best quality for downscaling)
+interpolation_modes   = ('nearest', 'linear', 'area', 'cubic')
+default_cache_size    = 1024    # MB
 
 # Supported file extensions
 video_file_extensions = ('wmv', 'avi', 'mp4')
@@ -56,6 +71,459 @@ video_fourcc          = {'wmv' : 'WMV1', 'avi' : 'MJPG', 'mp4' : 'mp4v'}
 MODE_VIDEO_INPUT      = 0
 MODE_VIDEO_OUTPUT     = 1
 
+# Color space
+COLOR_GRAYSCALE8      = 0
+COLOR_RGB888          = 1
+COLOR_BGR565          = 2
+COLOR_YUV420          = 3
+COLOR_NV12            = 4
+COLOR_NV21            = 5
+
+# OpenCV and NumPy are imported by a background thread once the server listens for
+# connections, so that clients connect without waiting for the import
+cv2                   = None
+np                    = None
+dependencies_lock     = threading.Lock()
+dependencies_thread   = None
+dependencies_error    = None
+
+
+def _importDependencies():
+    """
+    Import OpenCV and NumPy (background thread).
+    """
+    global cv2, np, dependencies_error
+
+    try:
+        import numpy as np
+        import cv2
+        logger.info("_importDependencies: OpenCV and NumPy imported")
+    except ImportError as err:
+        dependencies_error = f"VSI:Video:Server:ImportError: {err}"
+    except Exception as e:
+        dependencies_error = f"VSI:Video:Server:Exception: {type(e).__name__}: {e}"
+
+def loadDependencies():
+    """
+    Start importing OpenCV and NumPy in a background thread, if not already started.
+
+    Commands which do not use OpenCV (such as SET_MODE and SET_FILENAME) are served while the
+    dependencies are imported. Commands which need them wait for the import in waitDependencies().
+    Returns:
+        None
+    """
+    global dependencies_thread
+
+    with dependencies_lock:
+        if dependencies_thread is None:
+            dependencies_thread = threading.Thread(target=_importDependencies, daemon=True)
+            dependencies_thread.start()
+
+def waitDependencies():
+    """
+    Wait until OpenCV and NumPy are imported.
+
+    Returns:
+        None
+    Raises:
+        ImportError: If the dependencies could not be imported.
+    """
+    loadDependencies()
+    dependencies_thread.join()
+
+    if dependencies_error is not None:
+        raise ImportError(dependencies_error)
+
+
+class FrameGeometry:
+    """Plane layout and size of a frame in a given resolution and color space.
+
+    Frames are exchanged as the raw bytes of the following NumPy array shapes (uint8):
+    GRAYSCALE8 (height, width), RGB888 (height, width, 3), BGR565 (height, width, 2),
+    YUV420/NV12/NV21 (height * 3/2, width) with the Y plane followed by the chroma plane(s).
+    """
+    def __init__(self, width, height, color):
+        """
+        Compute the frame layout.
+
+        Args:
+            width: Frame width in pixels.
+            height: Frame height in pixels.
+            color: Frame color space (COLOR_* constant).
+        Returns:
+            None
+        Raises:
+            ValueError: If the color space is not supported or the resolution is not valid for it.
+        """
+        if color == COLOR_GRAYSCALE8:
+            shape = (height, width)
+        elif color == COLOR_RGB888:
+            shape = (height, width, 3)
+        elif color == COLOR_BGR565:
+            shape = (height, width, 2)
+        elif color in (COLOR_YUV420, COLOR_NV12, COLOR_NV21):
+            # Chroma is subsampled by 2 in both directions
+            if (width % 2 != 0) or (height % 2 != 0):
+                raise ValueError(f"{width}x{height} frame size is not even")
+            shape = ((height * 3) // 2, width)
+        else:
+            raise ValueError(f"color space {color} not supported")
+
+        self.width  = width
+        self.height = height
+        self.color  = color
+        self.shape  = shape
+        self.size   = math.prod(shape)
+
+    def view(self, buffer):
+        """
+        Get a frame array view onto a received frame buffer, without copying the frame.
+
+        Args:
+            buffer: Bytes-like object holding the frame (may be padded beyond the frame size).
+        Returns:
+            frame: NumPy array sharing the memory of the buffer.
+        Raises:
+            ValueError: If the buffer is smaller than the frame.
+        """
+        if len(buffer) < self.size:
+            raise ValueError(f"frame has {len(buffer)} bytes, expected {self.size} bytes")
+
+        return np.frombuffer(buffer, dtype=np.uint8, count=self.size).reshape(self.shape)
+
+    def data(self, frame):
+        """
+        Get the bytes of a frame array for transmission, without copying a contiguous frame.
+
+        Args:
+            frame: NumPy array in the frame layout.
+        Returns:
+            data: Flat memoryview of the frame bytes.
+        Raises:
+            ValueError: If the array does not match the frame layout.
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"frame shape {frame.shape} does not match {self.shape}")
+
+        return np.ascontiguousarray(frame).reshape(-1).data
+
+    def semiPlanar(self, frame, out=None):
+        """
+        Convert a YUV420 (I420) frame with separate U and V planes to interleaved NV12 or NV21 chroma.
+
+        Args:
+            frame: YUV420 frame array.
+            out: Destination frame array (None = allocate a new array).
+        Returns:
+            frame: Frame array in the color space of the geometry (NV12 or NV21).
+        """
+        y_size = self.width * self.height
+        c_size = y_size // 4
+
+        planes = frame.reshape(-1)
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        out = out.reshape(-1)
+        out[:y_size] = planes[:y_size]
+
+        # Chroma samples are interleaved as U/V pairs (NV12) or V/U pairs (NV21)
+        chroma = out[y_size:].reshape(c_size, 2)
+        u, v   = (0, 1) if self.color == COLOR_NV12 else (1, 0)
+        chroma[:, u] = planes[y_size:y_size + c_size]
+        chroma[:, v] = planes[y_size + c_size:]
+
+        return out.reshape(self.shape)
+
+
+class FrameTransform:
+    """Crop, resize and color conversion plan of decoded BGR frames to the stream frame layout.
+
+    The plan is computed once for the source frame size and applied to every frame of the
+    stream. Frames are converted into preallocated arrays: the resized frame and the color
+    conversion intermediate are reused for every frame, converted frames are stored in a
+    ring of `buffers` arrays so that frames still queued for transmission are not overwritten.
+    """
+    def __init__(self, src_width, src_height, geometry, interpolation, buffers):
+        """
+        Compute the transform plan.
+
+        Args:
+            src_width: Source frame width in pixels.
+            src_height: Source frame height in pixels.
+            geometry: FrameGeometry of the stream frames.
+            interpolation: Resize interpolation mode (one of interpolation_modes).
+            buffers: Number of converted frames which may be in use at the same time.
+        Returns:
+            None
+        """
+        self.source   = (src_height, src_width)
+        self.geometry = geometry
+
+        width  = geometry.width
+        height = geometry.height
+
+        # Crop the source frame to the target aspect ratio
+        target_aspect_ratio = width / height
+        frame_aspect_ratio  = src_width / src_height
+        crop_w, crop_h      = src_width, src_height
+
+        if abs(frame_aspect_ratio - target_aspect_ratio) > 1e-8 + 1e-3 * target_aspect_ratio:
+            if frame_aspect_ratio > target_aspect_ratio:
+                # Frame is wider than target -> crop left and right
+                crop_w = int(src_height * target_aspect_ratio)
+            else:
+                # Frame is taller than target -> crop top and bottom
+                crop_h = int(src_width / target_aspect_ratio)
+        left = (src_width - crop_w) // 2
+        top  = (src_height - crop_h) // 2
+        self.crop = (slice(top, top + crop_h), slice(left, left + crop_w))
+
+        # Resize the cropped frame to the target size
+        self.interpolation = getattr(cv2, f"INTER_{interpolation.upper()}")
+        self.resized       = None
+        if (crop_w != width) or (crop_h != height):
+            self.resized = np.empty((height, width, 3), dtype=np.uint8)
+
+        # Convert BGR to the target color space
+        color = geometry.color
+        self.planar = None
+        if color == COLOR_RGB888:
+            self.code = cv2.COLOR_BGR2RGB
+        elif color == COLOR_GRAYSCALE8:
+            self.code = cv2.COLOR_BGR2GRAY
+        elif color == COLOR_BGR565:
+            self.code = cv2.COLOR_BGR2BGR565
+        else:
+            self.code = cv2.COLOR_BGR2YUV_I420
+            if color in (COLOR_NV12, COLOR_NV21):
+                # OpenCV converts to separate chroma planes only, interleaved afterwards
+                self.planar = np.empty(geometry.shape, dtype=np.uint8)
+
+        self.frames = [np.empty(geometry.shape, dtype=np.uint8) for _ in range(buffers)]
+        self.index  = 0
+
+        logger.debug(f"FrameTransform: source=({src_width}, {src_height}), crop=({crop_w}, {crop_h}), "
+                     f"resize={self.resized is not None}, interpolation={interpolation}, color={color}")
+
+    def apply(self, frame):
+        """
+        Transform a decoded frame.
+
+        Args:
+            frame: Decoded BGR frame (NumPy array) of the source frame size.
+        Returns:
+            frame: Frame array in the stream frame layout (stored in the next buffer of the ring).
+        """
+        frame = frame[self.crop]
+
+        if self.resized is not None:
+            frame = cv2.resize(frame, (self.geometry.width, self.geometry.height),
+                               dst=self.resized, interpolation=self.interpolation)
+
+        out = self.frames[self.index]
+        self.index = (self.index + 1) % len(self.frames)
+
+        if self.planar is not None:
+            cv2.cvtColor(frame, self.code, dst=self.planar)
+            self.geometry.semiPlanar(self.planar, out)
+        else:
+            cv2.cvtColor(frame, self.code, dst=out)
+
+        return out
+
+
+class FrameCacheReader:
+    """Reads converted frames from a memory-mapped frame cache entry."""
+    def __init__(self, path, frame_size, eos_with_last):
+        """
+        Open and memory-map a frame cache entry.
+
+        Args:
+            path: Path of the cache entry file.
+            frame_size: Size of a single frame in bytes.
+            eos_with_last: True if end-of-stream is signaled together with the last frame
+                           (image sources), False if it is signaled by an empty frame (video sources).
+        Returns:
+            None
+        """
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.frame_size    = frame_size
+        self.frame_count   = len(self.map) // frame_size
+        self.frame_index   = 0
+        self.eos_with_last = eos_with_last
+
+    def read(self):
+        """
+        Read the next frame from the cache entry.
+
+        Returns:
+            tuple: (frame, eos) where frame is a bytearray (empty if no frame is available)
+                   and eos is a Boolean indicating end-of-stream.
+        """
+        if self.frame_index >= self.frame_count:
+            return bytearray(), True
+
+        offset = self.frame_index * self.frame_size
+        with memoryview(self.map) as view:
+            frame = bytearray(view[offset:offset + self.frame_size])
+        self.frame_index += 1
+
+        eos = self.eos_with_last and (self.frame_index == self.frame_count)
+
+        return frame, eos
+
+    def close(self):
+        """Unmap the cache entry."""
+        self.map.close()
+
+
+class FrameCacheWriter:
+    """Stores converted frames into a new frame cache entry."""
+    def __init__(self, cache, key, frame_size):
+        """
+        Create a temporary file for a new frame cache entry.
+
+        Args:
+            cache: FrameCache the entry belongs to.
+            key: Cache entry key.
+            frame_size: Size of a single frame in bytes.
+        Returns:
+            None
+        """
+        self.cache      = cache
+        self.key        = key
+        self.frame_size = frame_size
+        self.path       = cache.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.file       = open(self.path, 'wb')
+        self.size       = 0
+
+    def write(self, frame):
+        """
+        Append a frame to the cache entry.
+
+        The entry is discarded if the frame size is unexpected or the entry exceeds the cache size.
+        Args:
+            frame: Converted frame data.
+        Returns:
+            valid: True if the entry is still valid, False if it was discarded.
+        """
+        if (len(frame) != self.frame_size) or (self.size + len(frame) > self.cache.cache_size):
+            logger.debug(f"FrameCacheWriter: entry {self.key} not cacheable, discarded")
+            self.discard()
+            return False
+
+        self.file.write(frame)
+        self.size += len(frame)
+
+        return True
+
+    def commit(self):
+        """Complete the cache entry and make it available for lookups."""
+        self.file.close()
+        self.cache.evict(self.size)
+        os.replace(self.path, self.cache.cache_dir / f"{self.key}.raw")
+        logger.info(f"FrameCacheWriter: entry {self.key} stored, {self.size} bytes")
+
+    def discard(self):
+        """Remove the incomplete cache entry."""
+        self.file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class FrameCache:
+    """On-disk cache of converted input frame sequences.
+
+    Each entry holds all frames of an input file converted to a stream configuration,
+    stored back to back as raw data which is memory-mapped on reading. Entries are keyed
+    by file path, modification time, frame size, color space and frame rate. The total size
+    of all entries is bounded and least recently used entries are evicted first.
+    """
+    def __init__(self, cache_dir, cache_size):
+        """
+        Initialize the frame cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored.
+            cache_size: Maximum total size of cache entries in bytes.
+        Returns:
+            None
+        """
+        self.cache_dir  = Path(cache_dir).resolve()
+        self.cache_size = cache_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, file_path, frame_width, frame_height, frame_color, frame_rate, interpolation):
+        """
+        Get the cache entry key for an input file and stream configuration.
+
+        Returns:
+            key: Cache entry key (hex string).
+        """
+        stat = Path(file_path).stat()
+        text = f"{Path(file_path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}|"\
+               f"{frame_width}|{frame_height}|{frame_color}|{frame_rate}|{interpolation}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def openReader(self, key, frame_size, eos_with_last):
+        """
+        Open a cache entry for reading.
+
+        Returns:
+            reader: FrameCacheReader, or None if the entry is not cached.
+        """
+        path = self.cache_dir / f"{key}.raw"
+        try:
+            reader = FrameCacheReader(path, frame_size, eos_with_last)
+        except (OSError, ValueError):
+            return None
+
+        # Mark entry as recently used
+        os.utime(path)
+        logger.info(f"FrameCache: entry {key} found, {reader.frame_count} frames")
+
+        return reader
+
+    def openWriter(self, key, frame_size):
+        """
+        Create a new cache entry.
+
+        Returns:
+            writer: FrameCacheWriter, or None if the entry cannot be created.
+        """
+        try:
+            return FrameCacheWriter(self, key, frame_size)
+        except OSError as e:
+            logger.error(f"FrameCache: failed to create entry {key}: {e}")
+            return None
+
+    def evict(self, size):
+        """
+        Evict least recently used entries until an entry of the given size fits into the cache.
+
+        Args:
+            size: Size of the entry to be added in bytes.
+        Returns:
+            None
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.raw"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                pass
+
+        total = sum(entry[1] for entry in entries)
+
+        for _, entry_size, path in sorted(entries):
+            if total + size <= self.cache_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= entry_size
+            logger.info(f"FrameCache: entry {path.stem} evicted")
+
+
 class VideoServer:
     """Implements a TCP server for video streaming and frame I/O.
 
@@ -64,15 +532,24 @@ class VideoServer:
     enabling/disabling stream, reading/writing frames), and performs the requested video
     operations using OpenCV.
     """
-    def __init__(self, address, authkey):
+    def __init__(self, address, authkey, prefetch=default_prefetch, cache_dir=None, cache_size=default_cache_size,
+                 encode_queue=default_encode_queue, interpolation=default_interpolation, display=True):
         """
         Initialize the VideoServer.
 
         Sets up command codes, color space constants, and initializes all state variables.
-        Creates a Listener object for incoming client connections.
+        Creates a Listener object for incoming client connections, unless the server
+        is a session of a VideoDaemon which owns the listener.
         Args:
-            address: The (IP, port) tuple for the server to listen on.
+            address: The (IP, port) tuple or Unix domain socket path for the server to listen on (None for a daemon session).
             authkey: The authorization key for client connections.
+            prefetch: Number of input frames decoded ahead by a worker thread (0 = disabled).
+            cache_dir: Directory of the converted input frame cache (None = disabled).
+            cache_size: Maximum size of the converted input frame cache in MB.
+            encode_queue: Number of output frames queued for encoding by a worker thread (0 = encode on write).
+            interpolation: Resize interpolation mode of input frames (one of interpolation_modes).
+            display: Output streams without filename are shown in a display window
+                     (False for a daemon session, HighGUI is not thread-safe).
         Returns:
             None
         """
@@ -86,15 +563,19 @@ class VideoServer:
         self.FRAME_READ       = 7
         self.FRAME_WRITE      = 8
         self.CLOSE_SERVER     = 9
+        self.FRAME_BUFFER     = 10
+        self.ENCODE_STATUS    = 11
         # Color space
-        self.GRAYSCALE8       = 0
-        self.RGB888           = 1
-        self.BGR565           = 2
-        self.YUV420           = 3
-        self.NV12             = 4
-        self.NV21             = 5
+        self.GRAYSCALE8       = COLOR_GRAYSCALE8
+        self.RGB888           = COLOR_RGB888
+        self.BGR565           = COLOR_BGR565
+        self.YUV420           = COLOR_YUV420
+        self.NV12             = COLOR_NV12
+        self.NV21             = COLOR_NV21
         # Variables
-        self.listener         = Listener(address, authkey=authkey.encode('utf-8'))
+        self.listener         = None
+        if address is not None:
+            self.listener     = Listener(address, authkey=authkey.encode('utf-8'))
         self.device           = 0
         self.filename         = None
         self.mode             = MODE_VIDEO_INPUT
@@ -102,13 +583,48 @@ class VideoServer:
         self.video            = True
         self.stream           = None
         self.frame_ratio      = 0
-        self.frame_drop       = 0
         self.eos              = False
+        # Input frame selection (frame rate conversion)
+        self.frame_position   = 0       # Index of the next input frame in the stream
+        self.frame_output     = 0       # Index of the next output frame
+        self.frame_seek       = False   # Seeking is used to skip input frames
+        self.grab_cost        = None    # Measured time to skip one frame by grabbing (seconds)
+        self.seek_cost        = None    # Measured time to skip frames by seeking (seconds)
+        # Input video file opened in the background when the filename is set
+        self.preopen_thread   = None
+        self.preopen_stream   = None
+        self.preopen_filename = None
+        # Input frame transform plan
+        self.interpolation    = interpolation
+        self.transform        = None
+        # Input frame prefetch
+        self.prefetch         = prefetch
+        self.prefetch_queue   = None
+        self.prefetch_thread  = None
+        self.prefetch_stop    = threading.Event()
+        # Display window output
+        self.display          = display
+        # Output frame encoder
+        self.encode_depth     = encode_queue
+        self.encode_queue     = None
+        self.encode_thread    = None
+        # Shared memory frame buffer
+        self.shm              = None
+        self.shm_slots        = 0
+        self.shm_slot_size    = 0
+        self.shm_slot         = 0
+        # Converted input frame cache
+        self.cache            = None
+        self.cache_reader     = None
+        self.cache_writer     = None
+        if cache_dir is not None:
+            self.cache        = FrameCache(cache_dir, cache_size * 1024 * 1024)
         # Stream configuration
         self.frame_width      = None
         self.frame_height     = None
         self.frame_color      = None
         self.frame_rate       = None
+        self.geometry         = None
 
 
     def _setMode(self, mode):
@@ -176,6 +692,7 @@ class VideoServer:
         filename_valid = False
 
         self.filename = None
+        self.__releasePreopen()
 
         if filename == "":
             # Empty filename is valid (use microphone/speakers)
@@ -225,6 +742,10 @@ class VideoServer:
             self.filename = file_path
             logger.info(f"_setFilename: filename set to {self.filename}")
 
+            if (self.mode == MODE_VIDEO_INPUT) and (ext in video_file_extensions):
+                # Open the input video file while the client configures the stream
+                self.__startPreopen()
+
         return filename_valid
 
     def _configureStream(self, frame_width, frame_height, frame_rate, frame_color):
@@ -244,14 +765,17 @@ class VideoServer:
         if (frame_width == 0 or frame_height == 0 or frame_rate == 0):
             logger.error(f"_configureStream: invalid argument (width={frame_width}, height={frame_height}, rate={frame_rate})")
             return False
-        if frame_color not in (self.GRAYSCALE8, self.RGB888, self.BGR565, self.YUV420, self.NV12, self.NV21):
-            logger.error(f"_configureStream: invalid argument (color={frame_color})")
+        try:
+            geometry = FrameGeometry(frame_width, frame_height, frame_color)
+        except ValueError as e:
+            logger.error(f"_configureStream: invalid argument (color={frame_color}): {e}")
             return False
 
         self.frame_width  = frame_width
         self.frame_height = frame_height
         self.frame_rate   = frame_rate
         self.frame_color  = frame_color
+        self.geometry     = geometry
 
         logger.info(f"_configureStream: stream configured to {self.frame_width}x{self.frame_height}, fps={self.frame_rate}, color={self.frame_color}")
 
@@ -263,6 +787,8 @@ class VideoServer:
         Returns:
             Default device index for the current mode.
         """
+        waitDependencies()
+
         logger.info("=== Available Video Devices ===")
 
         available_devices = []
@@ -307,6 +833,7 @@ class VideoServer:
 
         Initializes the OpenCV VideoCapture or VideoWriter as needed.
         Handles both new and existing files, and sets up frame dropping if input FPS > requested FPS.
+        Input files found in the frame cache are replayed from the cache without decoding.
         Returns:
             None
         """
@@ -314,9 +841,19 @@ class VideoServer:
             logger.info("_enableStream: stream already active")
             return
 
+        if (self.mode == MODE_VIDEO_OUTPUT) and (self.filename == None) and not self.display:
+            # Session threads of the daemon must not use HighGUI
+            logger.error("_enableStream: display output is not supported by the video server daemon")
+            return
+
         self.eos = False
-        self.frame_ratio = 0
-        self.frame_drop  = 0
+        self.frame_ratio    = 0
+        self.frame_position = 0
+        self.frame_output   = 0
+        self.frame_seek     = False
+        self.grab_cost      = None
+        self.seek_cost      = None
+        self.transform      = None
 
         if self.stream is not None:
             self.stream.release()
@@ -325,8 +862,15 @@ class VideoServer:
         if self.filename == None:
             self.video = True
 
+        if (self.mode == MODE_VIDEO_INPUT) and (self.filename != None) and (self.cache is not None):
+            self.__openCache()
+
+        if self.cache_reader is None:
+            # Frames are decoded or encoded with OpenCV
+            waitDependencies()
+
         if self.video:
-            if self.mode == MODE_VIDEO_INPUT:
+            if (self.mode == MODE_VIDEO_INPUT) and (self.cache_reader is None):
                 # Input mode: read from camera or video file
                 if self.filename == None:
                     # No filename specified: use camera interface
@@ -339,11 +883,19 @@ class VideoServer:
                 else:
                     # Filename specified: use video file
                     logger.debug("_enableStream: use file interface for input streaming")
-                    self.stream = cv2.VideoCapture(self.filename)
+                    self.stream = self.__takePreopen()
+                    if self.stream is None:
+                        self.stream = cv2.VideoCapture(self.filename)
 
                 # Display stream properties
                 logger.info(f"_enableStream: source stream properties: width={self.stream.get(cv2.CAP_PROP_FRAME_WIDTH)}, height={self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT)}, fps={self.stream.get(cv2.CAP_PROP_FPS)}")
 
+                # Plan the frame transform for the source frame size
+                source_width  = int(self.stream.get(cv2.CAP_PROP_FRAME_WIDTH))
+                source_height = int(self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                if (source_width > 0) and (source_height > 0):
+                    self.__planTransform(source_width, source_height)
+
                 # Get the video stream FPS
                 video_fps = self.stream.get(cv2.CAP_PROP_FPS)
 
@@ -351,6 +903,9 @@ class VideoServer:
                     self.frame_ratio = video_fps / self.frame_rate
                     logger.debug(f"_enableStream: source/target frame ratio={self.frame_ratio}")
 
+                    # File sources can skip input frames by seeking
+                    self.frame_seek = (self.filename != None)
+
             if self.mode == MODE_VIDEO_OUTPUT:
                 # Output mode: write to video file or display window
                 if self.filename != None:
@@ -364,9 +919,19 @@ class VideoServer:
                 else:
                     logger.debug("_enableStream: output stream to display window")
 
+        # Release the input file opened in the background if it was not used (frame cache hit)
+        self.__releasePreopen()
+
         self.active = True
         logger.info("_enableStream: stream enabled")
 
+        if (self.mode == MODE_VIDEO_INPUT) and (self.prefetch > 0) and (self.cache_reader is None):
+            self.__startPrefetch()
+
+        if (self.mode == MODE_VIDEO_OUTPUT) and (self.encode_depth > 0) and (self.filename != None):
+            # Display window is updated on write, HighGUI is not used from a worker thread
+            self.__startEncoder()
+
     def _disableStream(self):
         """
         Disable the video stream and release OpenCV resources.
@@ -376,6 +941,12 @@ class VideoServer:
             None
         """
         self.active = False
+        self.__stopPrefetch()
+        self.__stopEncoder()
+        self.__closeCache()
+        self._closeFrameBuffer()
+        self.transform = None
+
         if self.stream is not None:
             # Clean-up stream resources and invalidate object
             self.stream.release()
@@ -383,62 +954,190 @@ class VideoServer:
 
         logger.info("_disableStream: stream disabled")
 
-    def __cropFrame(self, frame, target_aspect_ratio):
+    def __startPreopen(self):
+        """
+        Start opening the input video file in a background thread.
+
+        The file is opened while the client configures the stream, the opened capture is
+        taken by _enableStream when the stream is enabled.
+        Returns:
+            None
+        """
+        self.preopen_filename = self.filename
+        self.preopen_thread   = threading.Thread(target=self.__preopenWorker, args=(self.filename,), daemon=True)
+        self.preopen_thread.start()
+
+    def __preopenWorker(self, filename):
         """
-        Crop the input frame to match the specified aspect ratio.
+        Open the input video file (background thread).
 
         Args:
-            frame: The input frame (as NumPy array) to be cropped.
-            aspect_ratio: The target aspect ratio (width/height).
+            filename: Path of the input video file.
+        Returns:
+            None
+        """
+        loadDependencies()
+        dependencies_thread.join()
+        if dependencies_error is not None:
+            return
+
+        stream = cv2.VideoCapture(filename)
+        if stream.isOpened():
+            self.preopen_stream = stream
+            logger.debug(f"__preopenWorker: opened {filename}")
+        else:
+            stream.release()
+
+    def __takePreopen(self):
+        """
+        Take the input video file opened in the background.
+
+        Waits until the background open is finished.
         Returns:
-            frame: The cropped frame.
+            The opened VideoCapture of the stream filename, or None if it is not available.
         """
-        logger.debug(f"__cropFrame: original_size=({frame.shape[1]}, {frame.shape[0]}), target_aspect_ratio={target_aspect_ratio}")
+        stream = None
+
+        if self.preopen_thread is not None:
+            self.preopen_thread.join()
+            self.preopen_thread = None
+            if self.preopen_filename == self.filename:
+                stream = self.preopen_stream
+                self.preopen_stream = None
 
-        # NumPY array shape is (height, width, channels)
-        frame_h = frame.shape[0]
-        frame_w = frame.shape[1]
+        self.__releasePreopen()
 
-        frame_aspect_ratio = frame_w / frame_h
+        return stream
+
+    def __releasePreopen(self):
+        """
+        Release the input video file opened in the background (if any).
+
+        Returns:
+            None
+        """
+        if self.preopen_thread is not None:
+            self.preopen_thread.join()
+            self.preopen_thread = None
 
-        if frame_aspect_ratio > target_aspect_ratio:
-            # Frame is wider than target -> crop left and right
-            new_w = int(frame_h * target_aspect_ratio)
-            left = (frame_w - new_w) // 2
-            right = left + new_w
-            cropped = frame[:, left:right]
+        if self.preopen_stream is not None:
+            self.preopen_stream.release()
+            self.preopen_stream = None
+
+        self.preopen_filename = None
+
+    def __openCache(self):
+        """
+        Look up the input file in the frame cache.
+
+        On a cache hit, frames are replayed from the cache entry.
+        On a cache miss, a new cache entry is created and filled with the frames read from the input file.
+        Returns:
+            None
+        """
+        try:
+            key = self.cache.key(self.filename, self.frame_width, self.frame_height, self.frame_color, self.frame_rate,
+                                 self.interpolation)
+        except OSError as e:
+            logger.error(f"__openCache: failed to access input file: {e}")
+            return
+
+        self.cache_reader = self.cache.openReader(key, self.geometry.size, not self.video)
+        if self.cache_reader is None:
+            logger.debug(f"__openCache: frame cache miss, key={key}")
+            self.cache_writer = self.cache.openWriter(key, self.geometry.size)
         else:
-            # Frame is taller than target -> crop top and bottom
-            new_h = int(frame_w / target_aspect_ratio)
-            top = (frame_h - new_h) // 2
-            bottom = top + new_h
-            cropped = frame[top:bottom, :]
+            logger.debug(f"__openCache: frame cache hit, key={key}")
 
-        logger.debug(f"__cropFrame: cropped_size=({cropped.shape[1]}, {cropped.shape[0]})")
+    def __closeCache(self):
+        """
+        Close the frame cache entry used by the stream.
 
-        return cropped
+        An entry which was not completed up to the end-of-stream is discarded.
+        Returns:
+            None
+        """
+        if self.cache_reader is not None:
+            self.cache_reader.close()
+            self.cache_reader = None
+
+        if self.cache_writer is not None:
+            self.cache_writer.discard()
+            self.cache_writer = None
 
-    def __resizeFrame(self, frame, target_width, target_height):
+    def _openFrameBuffer(self, slots):
         """
-        Resize the input frame to the target width and height.
+        Create a shared memory frame buffer for the active stream.
 
+        The buffer is a ring of `slots` frame slots, each large enough for one frame
+        in the configured resolution and color space. While the buffer is open, frames
+        are exchanged through the slots and the connection carries only slot indexes.
         Args:
-            frame: The input frame (as NumPy array) to be resized.
-            target_width: The target width in pixels.
-            target_height: The target height in pixels.
+            slots: Number of frame slots.
         Returns:
-            frame: The resized frame.
+            frame_buffer: [name, slot_size] of the shared memory block, or None if not created.
         """
-        logger.debug(f"__resizeFrame: original_size=({frame.shape[1]}, {frame.shape[0]}), target_size=({target_width}, {target_height})")
+        logger.debug(f"_openFrameBuffer: slots={slots}")
+
+        if not self.active:
+            logger.error("_openFrameBuffer: stream not active")
+            return None
+
+        if slots <= 0:
+            logger.error(f"_openFrameBuffer: invalid argument (slots={slots})")
+            return None
+
+        self._closeFrameBuffer()
+
+        slot_size = self.geometry.size
 
         try:
-            frame = cv2.resize(frame, (target_width, target_height))
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
         except Exception as e:
-            logger.error(f"Error in resizeFrame(): {e}")
+            logger.error(f"_openFrameBuffer: failed to create shared memory: {e}")
+            self.shm = None
+            return None
 
-        logger.debug(f"__resizeFrame: resized_size=({frame.shape[1]}, {frame.shape[0]})")
+        self.shm_slots     = slots
+        self.shm_slot_size = slot_size
+        self.shm_slot      = 0
 
-        return frame
+        logger.info(f"_openFrameBuffer: shared memory {self.shm.name} created, {slots} slots of {slot_size} bytes")
+
+        return [self.shm.name, slot_size]
+
+    def _closeFrameBuffer(self):
+        """
+        Release the shared memory frame buffer (if created).
+
+        Returns:
+            None
+        """
+        if self.shm is None:
+            return
+
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except Exception as e:
+            logger.error(f"_closeFrameBuffer: error during cleanup: {e}")
+
+        self.shm = None
+        logger.info("_closeFrameBuffer: shared memory released")
+
+    def __planTransform(self, source_width, source_height):
+        """
+        Compute the transform plan of input frames for the source frame size.
+
+        Converted frames stay in use while queued by the prefetch worker, plus the frame being
+        decoded and the frame being transmitted.
+        Args:
+            source_width: Source frame width in pixels.
+            source_height: Source frame height in pixels.
+        Returns:
+            None
+        """
+        self.transform = FrameTransform(source_width, source_height, self.geometry, self.interpolation, self.prefetch + 2)
 
     def __convertToBGR(self, frame):
         """
@@ -476,52 +1175,128 @@ class VideoServer:
 
         return frame
 
-    def __convertFromBGR(self, frame):
+    def __startPrefetch(self):
         """
-        Convert the input BGR frame to the specified color space if needed.
+        Start the worker thread which decodes input frames ahead of FRAME_READ requests.
 
-        Args:
-            frame: The input frame (as NumPy array in BGR color space) to be converted.
+        Decoded and converted frames are stored in a bounded queue holding up to
+        `prefetch` frames.
         Returns:
-            frame: The converted frame in the specified color space.
+            None
         """
-        if self.frame_color == self.RGB888:
-            # Convert BGR to RGB
-            logger.debug(f"__convertFromBGR: converting frame from BGR to RGB")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        elif self.frame_color == self.GRAYSCALE8:
-            # Convert BGR to Grayscale
-            logger.debug(f"__convertFromBGR: converting frame from BGR to Grayscale")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        elif self.frame_color == self.BGR565:
-            # Convert BGR to BGR565
-            logger.debug(f"__convertFromBGR: converting frame from BGR to BGR565")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGR565)
-        elif self.frame_color == self.YUV420:
-            # Convert BGR to YUV420
-            logger.debug(f"__convertFromBGR: converting frame from BGR to YUV420")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
-        elif self.frame_color == self.NV12:
-            # Convert BGR to NV12
-            logger.debug(f"__convertFromBGR: converting frame from BGR to NV12")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_NV12)
-        elif self.frame_color == self.NV21:
-            # Convert BGR to NV21
-            logger.debug(f"__convertFromBGR: converting frame from BGR to NV21")
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_NV21)
+        self.prefetch_stop.clear()
+        self.prefetch_queue  = queue.Queue(maxsize=self.prefetch)
+        self.prefetch_thread = threading.Thread(target=self.__prefetchWorker, daemon=True)
+        self.prefetch_thread.start()
+        logger.info(f"__startPrefetch: prefetch enabled, depth={self.prefetch} frames")
 
-        return frame
+    def __stopPrefetch(self):
+        """
+        Stop the prefetch worker thread and discard any frames not yet read.
+
+        Returns:
+            None
+        """
+        if self.prefetch_thread is None:
+            return
+
+        self.prefetch_stop.set()
+        self.prefetch_thread.join()
+        self.prefetch_thread = None
+        self.prefetch_queue  = None
+        logger.info("__stopPrefetch: prefetch disabled")
+
+    def __prefetchWorker(self):
+        """
+        Prefetch worker thread.
+
+        Decodes frames from the input source into the prefetch queue until
+        end-of-stream is reached or the worker is stopped.
+        Returns:
+            None
+        """
+        eos = False
+
+        while not eos and not self.prefetch_stop.is_set():
+            try:
+                frame, eos = self.__decodeFrame()
+            except Exception as e:
+                logger.error(f"Exception in __prefetchWorker: {type(e).__name__}: {e}")
+                frame, eos = bytearray(), True
+
+            # Wait for free space in the queue, unless the worker is stopped
+            while not self.prefetch_stop.is_set():
+                try:
+                    self.prefetch_queue.put((frame, eos), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+        logger.debug("__prefetchWorker: worker finished")
 
     # Read frame from source
+    def __startEncoder(self):
+        """
+        Start the worker thread which encodes output frames written by FRAME_WRITE.
+
+        Written frames are stored in a bounded queue holding up to `encode_queue` frames,
+        so that encoding overlaps with the simulation.
+        Returns:
+            None
+        """
+        self.encode_queue  = queue.Queue(maxsize=self.encode_depth)
+        self.encode_thread = threading.Thread(target=self.__encodeWorker, daemon=True)
+        self.encode_thread.start()
+        logger.info(f"__startEncoder: encode queue enabled, depth={self.encode_depth} frames")
+
+    def __stopEncoder(self):
+        """
+        Stop the encoder worker thread after all queued frames are encoded.
+
+        Returns:
+            None
+        """
+        if self.encode_thread is None:
+            return
+
+        self.encode_queue.put(None)
+        self.encode_thread.join()
+        self.encode_thread = None
+        self.encode_queue  = None
+        logger.info("__stopEncoder: encode queue flushed")
+
+    def __encodeWorker(self):
+        """
+        Encoder worker thread.
+
+        Encodes frames from the encode queue until the stop marker (None) is taken.
+        Returns:
+            None
+        """
+        while True:
+            frame = self.encode_queue.get()
+            if frame is None:
+                break
+            self.__encodeFrame(frame)
+
+    def _encodeBusy(self):
+        """
+        Check if the encode queue is full, a further frame written would wait for the encoder.
+
+        Returns:
+            True if the encode queue is full, False otherwise.
+        """
+        return (self.encode_queue is not None) and self.encode_queue.full()
+
     def _readFrame(self):
         """Read a single frame from the current video or image source.
 
         If the stream is not active or end-of-stream is reached, returns an empty bytearray.
-        For video sources, handles frame dropping to match requested frame rate.
-        For image sources, reads the image once and sets end-of-stream.
-        Resizes and converts color space as needed.
+        When the source is cached, the frame is copied from the frame cache entry.
+        When prefetch is enabled, the frame is taken from the prefetch queue,
+        otherwise it is decoded from the source on request.
         Returns:
-            frame: The read frame as a bytearray, or empty if no frame is available.
+            frame: The read frame as a bytes-like object, or empty if no frame is available.
         """
         frame = bytearray()
 
@@ -535,118 +1310,187 @@ class VideoServer:
             logger.debug("_readFrame: end of stream reached")
             return frame
 
+        if self.cache_reader is not None:
+            # Take the next frame from the frame cache
+            frame, self.eos = self.cache_reader.read()
+        elif self.prefetch_thread is not None:
+            # Take the next frame decoded by the prefetch worker
+            frame, self.eos = self.prefetch_queue.get()
+            logger.debug(f"_readFrame: frame taken from prefetch queue, {self.prefetch_queue.qsize()} frames left")
+        else:
+            frame, self.eos = self.__decodeFrame()
+
+        if self.cache_writer is not None:
+            # Store the frame into the frame cache
+            if (len(frame) > 0) and not self.cache_writer.write(frame):
+                self.cache_writer = None
+            elif self.eos:
+                self.cache_writer.commit()
+                self.cache_writer = None
+
+        return frame
+
+    def __skipFrames(self):
+        """
+        Skip the input frames between the previous and the next output frame.
+
+        The next output frame is the input frame at the timestamp of the output frame.
+        Frames are skipped by grabbing them without retrieving (no color conversion),
+        or by seeking in file sources when seeking was measured to be faster than grabbing
+        the frames (seeking decodes from the preceding key frame).
+        Returns:
+            None
+        """
+        target = int(self.frame_output * self.frame_ratio + 1e-6)
+        skip   = target - self.frame_position
+        if skip <= 0:
+            return
+
+        # Seek when not measured yet or cheaper than grabbing the frames
+        if self.frame_seek and (skip > 1) and ((self.seek_cost is None) or
+                                             ((self.grab_cost is not None) and (skip * self.grab_cost > self.seek_cost))):
+            start = time.perf_counter()
+            if self.stream.set(cv2.CAP_PROP_POS_FRAMES, target):
+                position = int(self.stream.get(cv2.CAP_PROP_POS_FRAMES))
+            else:
+                position = self.frame_position
+            cost = time.perf_counter() - start
+
+            if position == target:
+                self.seek_cost = cost if self.seek_cost is None else (self.seek_cost + cost) / 2
+                self.frame_position = target
+                logger.debug(f"__skipFrames: seek to frame {target}, {cost * 1000:.2f} ms")
+                return
+
+            # Seeking is not frame accurate for this source, grab the remaining frames
+            logger.debug(f"__skipFrames: seek to frame {target} ended at frame {position}, seeking disabled")
+            self.frame_seek     = False
+            self.frame_position = position
+            skip = target - position
+            if skip <= 0:
+                return
+
+        start = time.perf_counter()
+        for _ in range(skip):
+            if not self.stream.grab():
+                break
+            self.frame_position += 1
+        cost = (time.perf_counter() - start) / max(skip, 1)
+
+        self.grab_cost = cost if self.grab_cost is None else (self.grab_cost + cost) / 2
+        logger.debug(f"__skipFrames: {skip} frames grabbed, {cost * 1000:.2f} ms per frame")
+
+    def __decodeFrame(self):
+        """Decode a single frame from the current video or image source.
+
+        For video sources, handles frame dropping to match requested frame rate.
+        For image sources, reads the image once and signals end-of-stream.
+        Resizes and converts color space as needed.
+        Returns:
+            tuple: (frame, eos) where frame is a bytes-like object (empty if no frame is available)
+                   and eos is a Boolean indicating end-of-stream.
+        """
+        frame = bytearray()
+        eos   = False
+
         if self.video:
+            # Skip input frames if input FPS > requested FPS
+            if self.frame_ratio > 1:
+                self.__skipFrames()
+
             # Video source, read frame from the video stream
             _, frame_in = self.stream.read() # Frame is numpy.ndarray, (height, width, channels), dtype=uint8
 
             if frame_in is not None:
-                logger.debug(f"_readFrame: frame captured, size=({frame_in.shape[1]}, {frame_in.shape[0]})")
-
-                # Handle frame dropping if input FPS > requested FPS
-                if self.frame_ratio > 1:
-                    # Accumulate fractional frames to drop
-                    self.frame_drop += (self.frame_ratio - 1)
-
-                    if self.frame_drop > 1:
-                        logger.debug(f"_readFrame: frames to drop={self.frame_drop}")
-                        drop = int(self.frame_drop // 1)
-
-                        # Drop the required number of frames to match requested FPS
-                        for i in range(drop):
-                            _, _ = self.stream.read()
-                        logger.debug(f"_readFrame: frames dropped={drop}")
-                        self.frame_drop -= drop
-                        logger.debug(f"_readFrame: frames left to drop={self.frame_drop}")
+                logger.debug(f"__decodeFrame: frame captured, size=({frame_in.shape[1]}, {frame_in.shape[0]})")
+                self.frame_position += 1
+                self.frame_output   += 1
             else:
                 # Frame not read, mark end-of-stream
-                self.eos = True
-                logger.debug("_readFrame: end of stream.")
+                eos = True
+                logger.debug("__decodeFrame: end of stream.")
         else:
             # For image sources, read the image once and set end-of-stream
             frame_in = cv2.imread(self.filename)
-            self.eos  = True
-            logger.debug("_readFrame: end of stream.")
+            eos = True
+            logger.debug("__decodeFrame: end of stream.")
 
         if frame_in is not None:
-            target_width  = self.frame_width
-            target_height = self.frame_height
-
-            frame_in_width = frame_in.shape[1]
-            frame_in_height = frame_in.shape[0]
+            if (self.transform is None) or (self.transform.source != frame_in.shape[:2]):
+                # Source frame size not known when the stream was enabled (image source) or changed
+                logger.debug(f"__decodeFrame: planning frame transform for source size ({frame_in.shape[1]}, {frame_in.shape[0]})")
+                self.__planTransform(frame_in.shape[1], frame_in.shape[0])
 
-            # Check the target frame size aspect ratio
-            target_aspect_ratio = target_width / target_height
-            frame_aspect_ratio = frame_in_width / frame_in_height
+            # Crop, resize and convert the frame to the target size and color space
+            frame = self.geometry.data(self.transform.apply(frame_in))
 
-            if not np.isclose(frame_aspect_ratio, target_aspect_ratio, rtol=1e-3):
-                logger.debug(f"_readFrame: frame aspect ratio {frame_aspect_ratio:.2f} does not match target {target_aspect_ratio:.2f}, cropping frame")
-                frame_in = self.__cropFrame(frame_in, target_aspect_ratio)
+        return frame, eos
 
-                # Update frame size after cropping
-                frame_in_width = frame_in.shape[1]
-                frame_in_height = frame_in.shape[0]
+    def _writeFrame(self, frame):
+        """
+        Write a frame to the output destination (file or display window).
 
-            # Check the target frame size
-            if (frame_in_width != target_width) or (frame_in_height != target_height):
-                logger.debug(f"_readFrame: frame size ({frame_in_width}, {frame_in_height}) does not match target ({target_width}, {target_height}), resizing frame")
-                frame_in = self.__resizeFrame(frame_in, target_width, target_height)
+        When the encode queue is enabled, the frame is copied into the queue and encoded by
+        the encoder worker thread, waiting for the encoder only when the queue is full.
+        Frames are never dropped, the returned busy state is a hint for the client to slow down.
+        Otherwise the frame is encoded on write.
+        Args:
+            frame: The input frame as a bytes-like object to be written.
+        Returns:
+            busy: True if the encode queue is full after the frame is written, False otherwise.
+        """
+        logger.debug(f"_writeFrame: frame size={len(frame)} bytes")
 
-            # Convert frame color space to target color space
-            frame_in = self.__convertFromBGR(frame_in)
+        # If the stream is not active, do nothing
+        if not self.active:
+            logger.error("_writeFrame: stream not active")
+            return False
 
-            # Convert the frame to a bytearray for transmission
-            frame = bytearray(frame_in.tobytes())
+        if self.encode_thread is not None:
+            self.encode_queue.put(bytes(frame))
+            return self._encodeBusy()
 
-        return frame
+        self.__encodeFrame(frame)
+        return False
 
-    def _writeFrame(self, frame):
+    def __encodeFrame(self, frame):
         """
-        Write a frame to the output destination (file or display window).
+        Encode a frame to the output destination (file or display window).
 
         If filename is empty, displays the frame in a window.
         If filename is set and video mode, writes frame to video file.
         If filename is set and image mode, saves frame as image file.
         Args:
-            frame: The input frame as a bytearray to be written.
+            frame: The input frame as a bytes-like object to be written.
         Returns:
             None
         """
-        logger.debug(f"_writeFrame: frame size={len(frame)} bytes")
-
-        # If the stream is not active, do nothing
-        if not self.active:
-            logger.error("_writeFrame: stream not active")
-            return
-
         try:
-            # Decode the frame from bytearray to a NumPy array
-            decoded_frame = np.frombuffer(frame, dtype=np.uint8)
-
-            # Reshape the decoded frame to match the target resolution
-            decoded_frame = decoded_frame.reshape((self.frame_height, self.frame_width, 3))
-            logger.debug(f"_writeFrame: decoded frame size=({decoded_frame.shape[1]}, {decoded_frame.shape[0]})")
+            # View the frame bytes in the frame layout of the configured color space
+            decoded_frame = self.geometry.view(frame)
+            logger.debug(f"__encodeFrame: decoded frame shape={decoded_frame.shape}")
 
             # Convert color space to BGR
             frame_out = self.__convertToBGR(decoded_frame)
 
             if self.filename == None:
-                logger.debug("_writeFrame: display frame in window")
+                logger.debug("__encodeFrame: display frame in window")
                 # If no filename, display the frame in a window
                 cv2.imshow(self.filename, frame_out)
                 cv2.waitKey(10)
             else:
                 if self.video:
-                    logger.debug("_writeFrame: write frame to video file")
+                    logger.debug("__encodeFrame: write frame to video file")
                     # Write frame to video file
                     self.stream.write(np.uint8(frame_out))
                 else:
-                    logger.debug("_writeFrame: write frame as image file")
+                    logger.debug("__encodeFrame: write frame as image file")
                     # Write frame as image file
                     cv2.imwrite(self.filename, frame_out)
 
         except Exception as e:
             # Output exception debug information but continue
-            logger.error(f"Exception in _writeFrame: {type(e).__name__}: {e}", exc_info=True)
+            logger.error(f"Exception in __encodeFrame: {type(e).__name__}: {e}", exc_info=True)
             pass
 
 
@@ -667,68 +1511,209 @@ class VideoServer:
             logger.error("Connection not accepted")
             return
 
-        while True:
-            try:
-                recv = conn.recv()
-            except EOFError:
-                return
+        self.serve(conn)
+
+    def serve(self, conn):
+        """
+        Session loop.
+
+        Processes commands received on the client connection until the client disconnects.
+        Args:
+            conn: The accepted client connection.
+        Returns:
+            None
+        """
+        try:
+            while True:
+                try:
+                    cmd, flags, seq, payload = recvMessage(conn)
+                except (EOFError, OSError):
+                    break
+                except ValueError as e:
+                    logger.error(f"serve: invalid message: {e}")
+                    break
+
+                try:
+                    if   cmd == self.SET_MODE:
+                        current_mode = self._setMode(unpackValues(payload)[0])
+                        sendMessage(conn, cmd, seq, packValues(current_mode))
+
+                    elif cmd == self.SET_DEVICE:
+                        device_valid = self._setDevice(unpackValues(payload)[0])
+                        sendMessage(conn, cmd, seq, packValues(device_valid))
+
+                    elif cmd == self.SET_FILENAME:
+                        base_dir, filename = unpackStrings(payload)
+                        filename_valid = self._setFilename(base_dir, filename)
+                        sendMessage(conn, cmd, seq, packValues(filename_valid))
+
+                    elif cmd == self.STREAM_CONFIGURE:
+                        configuration_valid = self._configureStream(*unpackValues(payload))
+                        sendMessage(conn, cmd, seq, packValues(configuration_valid))
+
+                    elif cmd == self.STREAM_ENABLE:
+                        self._enableStream()
+                        sendMessage(conn, cmd, seq, packValues(self.active))
+
+                    elif cmd == self.STREAM_DISABLE:
+                        self._disableStream()
+                        sendMessage(conn, cmd, seq, packValues(self.active))
+
+                    elif cmd == self.FRAME_READ:
+                        frame = self._readFrame()
+                        flags = FLAG_EOS if self.eos else 0
+                        if self.shm is not None:
+                            # Store frame in the next shared memory slot
+                            slot   = self.shm_slot
+                            size   = min(len(frame), self.shm_slot_size)
+                            offset = slot * self.shm_slot_size
+                            self.shm.buf[offset:offset + size] = frame[:size]
+                            self.shm_slot = (slot + 1) % self.shm_slots
+                            sendMessage(conn, cmd, seq, packValues(slot, size), flags)
+                        else:
+                            sendMessage(conn, cmd, seq, frame, flags)
+
+                    elif cmd == self.FRAME_WRITE:
+                        if self.shm is not None:
+                            # Frame is stored in shared memory slot
+                            slot, size = unpackValues(payload)
+                            offset = slot * self.shm_slot_size
+                            with self.shm.buf[offset:offset + size] as frame:
+                                busy = self._writeFrame(frame)
+                            # Acknowledge that the slot can be reused, report encode queue state
+                            sendMessage(conn, cmd, seq, packValues(busy))
+                        else:
+                            # Frame is carried in the command message
+                            busy = self._writeFrame(payload)
+                            # Acknowledge the frame, report encode queue state
+                            sendMessage(conn, cmd, seq, packValues(busy))
+
+                    elif cmd == self.ENCODE_STATUS:
+                        sendMessage(conn, cmd, seq, packValues(self._encodeBusy()))
+
+                    elif cmd == self.FRAME_BUFFER:
+                        frame_buffer = self._openFrameBuffer(unpackValues(payload)[0])
+                        if frame_buffer is not None:
+                            # Payload: slot size followed by the shared memory name
+                            name, slot_size = frame_buffer
+                            sendMessage(conn, cmd, seq, packValues(slot_size) + packStrings(name))
+                        else:
+                            sendMessage(conn, cmd, seq)
+
+                    elif cmd == self.CLOSE_SERVER:
+                        self.stop()
+
+                except (BrokenPipeError, ConnectionResetError, EOFError):
+                    # Client closed the connection before taking the reply, end of session
+                    break
+
+                except ImportError as e:
+                    # OpenCV not available: fail the command and end the session
+                    logger.error(f"serve: {e}")
+                    if (cmd == self.FRAME_READ) and (self.shm is not None):
+                        payload = packValues(0, 0)
+                    elif cmd in (self.FRAME_READ, self.FRAME_BUFFER):
+                        payload = b''
+                    else:
+                        payload = packValues(0)
+                    sendMessage(conn, cmd, seq, payload, FLAG_EOS | FLAG_ERROR)
+                    break
+        finally:
+            # Client disconnected, release session resources
+            self._disableStream()
+            self.__releasePreopen()
+            conn.close()
 
-            cmd     = recv[0]  # Command
-            payload = recv[1:] # Payload
+    def stop(self):
+        """
+        Stop the video server.
 
-            if   cmd == self.SET_MODE:
-                current_mode = self._setMode(payload[0])
-                conn.send(current_mode)
+        Releases all resources and closes any open windows.
+        Returns:
+            None
+        """
+        self._disableStream()
+        self.__releasePreopen()
+        if (self.mode == MODE_VIDEO_OUTPUT) and (self.filename == None):
+            try:
+                cv2.destroyAllWindows()
+            except Exception:
+                pass
+        if self.listener is not None:
+            self.listener.close()
+        logger.info("Video server stopped")
 
-            elif cmd == self.SET_DEVICE:
-                device_valid = self._setDevice(payload[0])
-                conn.send(device_valid)
 
-            elif cmd == self.SET_FILENAME:
-                filename_valid = self._setFilename(payload[0], payload[1])
-                conn.send(filename_valid)
+class VideoDaemon:
+    """Implements a long-lived video server serving many clients concurrently.
 
-            elif cmd == self.STREAM_CONFIGURE:
-                configuration_valid = self._configureStream(payload[0], payload[1], payload[2], payload[3])
-                conn.send(configuration_valid)
+    Each accepted client connection is served by its own VideoServer session running
+    in a separate thread, so that multiple simulations can share one server process
+    and skip the server start-up time. Sessions do not support display window output,
+    since OpenCV HighGUI is not thread-safe.
+    """
+    def __init__(self, address, authkey, prefetch=default_prefetch, cache_dir=None, cache_size=default_cache_size,
+                 encode_queue=default_encode_queue, interpolation=default_interpolation):
+        """
+        Initialize the VideoDaemon.
 
-            elif cmd == self.STREAM_ENABLE:
-                self._enableStream()
-                conn.send(self.active)
+        Creates a Listener object for incoming client connections.
+        Args:
+            address: The (IP, port) tuple or Unix domain socket path for the server to listen on.
+            authkey: The authorization key for client connections.
+            prefetch: Number of input frames decoded ahead in each session (0 = disabled).
+            cache_dir: Directory of the converted input frame cache (None = disabled).
+            cache_size: Maximum size of the converted input frame cache in MB.
+            encode_queue: Number of output frames queued for encoding in each session (0 = encode on write).
+            interpolation: Resize interpolation mode of input frames (one of interpolation_modes).
+        Returns:
+            None
+        """
+        self.listener      = Listener(address, authkey=authkey.encode('utf-8'))
+        self.prefetch      = prefetch
+        self.cache_dir     = cache_dir
+        self.cache_size    = cache_size
+        self.encode_queue  = encode_queue
+        self.interpolation = interpolation
+        self.sessions      = 0
+        self.stopped       = False
 
-            elif cmd == self.STREAM_DISABLE:
-                self._disableStream()
-                conn.send(self.active)
+    def run(self):
+        """
+        Main daemon loop.
 
-            elif cmd == self.FRAME_READ:
-                frame = self._readFrame()
-                conn.send_bytes(frame)
-                conn.send(self.eos)
+        Accepts client connections and starts a VideoServer session thread for each of them.
+        """
+        logger.info("Video daemon started")
 
-            elif cmd == self.FRAME_WRITE:
-                frame = conn.recv_bytes()
-                self._writeFrame(frame)
+        while True:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                if self.stopped:
+                    # Listener closed
+                    break
+                # Handshake failed (client disconnected or authorization failed), keep listening
+                logger.error(f"Connection not accepted: {type(e).__name__}: {e}")
+                continue
 
-            elif cmd == self.CLOSE_SERVER:
-                self.stop()
+            self.sessions += 1
+            logger.info(f"Connection accepted {self.listener.address}, session {self.sessions}")
 
+            session = VideoServer(None, None, self.prefetch, self.cache_dir, self.cache_size, self.encode_queue,
+                                  self.interpolation, display=False)
+            threading.Thread(target=session.serve, args=(conn,), daemon=True).start()
 
     def stop(self):
         """
-        Stop the video server.
+        Stop the video daemon.
 
-        Releases all resources and closes any open windows.
         Returns:
             None
         """
-        self._disableStream()
-        if (self.mode == MODE_VIDEO_OUTPUT) and (self.filename == None):
-            try:
-                cv2.destroyAllWindows()
-            except Exception:
-                pass
+        self.stopped = True
         self.listener.close()
-        logger.info("Video server stopped")
+        logger.info("Video daemon stopped")
 
 
 def ip(ip):
@@ -747,7 +1732,8 @@ def ip(ip):
 
 def parse_arguments():
     """
-    Parse command-line arguments for the video server (IP, port, authkey).
+    Parse command-line arguments for the video server (IP, port, Unix domain socket, authkey, address report,
+    prefetch, frame cache, encode queue, interpolation, daemon).
     Returns:
         args: The parsed command-line arguments.
     """
@@ -761,16 +1747,58 @@ def parse_arguments():
     parser_optional.add_argument("--port", dest="port",  metavar="<TCP Port>",
                                         help=f"TCP port (default: {default_address[1]})",
                                         type=int, default=default_address[1])
+    parser_optional.add_argument("--unix", dest="unix",  metavar="<Path>",
+                                        help="Unix domain socket path, used instead of IP address and port (default: TCP)",
+                                        type=str, default=None)
     parser_optional.add_argument("--authkey", dest="authkey",  metavar="<Auth Key>",
                                         help=f"Authorization key (default: {default_authkey})",
                                         type=str, default=default_authkey)
+    parser_optional.add_argument("--report", dest="report",
+                                        help="Report the bound server address on standard output (for --port 0)",
+                                        action="store_true")
+    parser_optional.add_argument("--prefetch", dest="prefetch",  metavar="<Frames>",
+                                        help=f"Number of input frames decoded ahead (default: {default_prefetch})",
+                                        type=int, default=default_prefetch)
+    parser_optional.add_argument("--cache-dir", dest="cache_dir",  metavar="<Directory>",
+                                        help="Converted input frame cache directory (default: cache disabled)",
+                                        type=str, default=None)
+    parser_optional.add_argument("--cache-size", dest="cache_size",  metavar="<MB>",
+                                        help=f"Converted input frame cache size in MB (default: {default_cache_size})",
+                                        type=int, default=default_cache_size)
+    parser_optional.add_argument("--encode-queue", dest="encode_queue",  metavar="<Frames>",
+                                        help=f"Number of output frames queued for encoding (default: {default_encode_queue})",
+                                        type=int, default=default_encode_queue)
+    parser_optional.add_argument("--interpolation", dest="interpolation",  metavar="<Mode>",
+                                        help=f"Resize interpolation of input frames: {', '.join(interpolation_modes)} (default: {default_interpolation})",
+                                        type=str, choices=interpolation_modes, default=default_interpolation)
+    parser_optional.add_argument("--daemon", dest="daemon",
+                                        help="Run as a long-lived server serving multiple clients",
+                                        action="store_true")
 
     return parser.parse_args()
 
 if __name__ == '__main__':
     args = parse_arguments()
-    Server = VideoServer((args.ip, args.port), args.authkey)
+    if args.unix is not None:
+        address = args.unix
+        # Remove the socket file left behind by a server which did not exit cleanly
+        if not removeStaleSocket(address):
+            raise SystemExit(f"VSI:Video:Server: server already listening on {address}")
+    else:
+        address = (args.ip, args.port)
+    if args.daemon:
+        Server = VideoDaemon(address, args.authkey, args.prefetch, args.cache_dir, args.cache_size,
+                             args.encode_queue, args.interpolation)
+    else:
+        Server = VideoServer(address, args.authkey, args.prefetch, args.cache_dir, args.cache_size,
+                             args.encode_queue, args.interpolation)
+    if args.report:
+        reportAddress(Server.listener.address)
+    # Listener is bound, import OpenCV while waiting for the client
+    loadDependencies()
     try:
         Server.run()
     except KeyboardInterrupt:
         Server.stop()
+    if (not args.daemon) and (dependencies_error is not None):
+        raise SystemExit(dependencies_error)
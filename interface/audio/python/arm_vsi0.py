@@ -11,7 +11,8 @@
 #More details.
 
 import logging
-import wave
+import mmap
+from struct import unpack_from
 
 logger = logging.getLogger(__name__)
 
@@ -64,31 +65,71 @@ CONTROL_ENABLE_Msk = 1<<0
 Data = bytearray()
 
 
-## Open WAVE file (store object into global WAVE object)
+# WAVE file (memory-mapped)
+WAVE        = None
+WAVE_View   = None
+WAVE_Offset = 0   # Offset of next frame to read
+WAVE_End    = 0   # Offset of data chunk end
+WAVE_Frame  = 1   # Frame size in bytes
+
+
+## Open WAVE file (memory-map file into global WAVE object and parse RIFF header)
 #  @param name name of WAVE file to open
 def openWAVE(name):
-    global WAVE
+    global WAVE, WAVE_View, WAVE_Offset, WAVE_End, WAVE_Frame
     logger.info("Open WAVE file (read mode): {}".format(name))
-    WAVE = wave.open(name, 'rb')
-    logger.info("  Number of channels: {}".format(WAVE.getnchannels()))
-    logger.info("  Sample bits: {}".format(WAVE.getsampwidth() * 8))
-    logger.info("  Sample rate: {}".format(WAVE.getframerate()))
-    logger.info("  Number of frames: {}".format(WAVE.getnframes()))
-
-## Read WAVE frames (global WAVE object) into global AudioFrames object
+    with open(name, 'rb') as file:
+        WAVE = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    WAVE_View = memoryview(WAVE)
+
+    if (WAVE[0:4] != b'RIFF') or (WAVE[8:12] != b'WAVE'):
+        logger.error("Not a RIFF/WAVE file: {}".format(name))
+
+    # Locate fmt and data chunks
+    channels = sample_rate = sample_bits = 0
+    WAVE_Offset = 0
+    WAVE_End    = 0
+    pos = 12
+    while (pos + 8) <= len(WAVE):
+        chunk_id   = WAVE[pos:pos + 4]
+        chunk_size = unpack_from('<I', WAVE, pos + 4)[0]
+        pos += 8
+        if chunk_id == b'fmt ':
+            _, channels, sample_rate, _, WAVE_Frame, sample_bits = unpack_from('<HHIIHH', WAVE, pos)
+        elif chunk_id == b'data':
+            WAVE_Offset = pos
+            WAVE_End    = min(pos + chunk_size, len(WAVE))
+            break
+        pos += chunk_size + (chunk_size & 1)
+
+    # Read whole frames only
+    WAVE_End -= (WAVE_End - WAVE_Offset) % WAVE_Frame
+
+    logger.info("  Number of channels: {}".format(channels))
+    logger.info("  Sample bits: {}".format(sample_bits))
+    logger.info("  Sample rate: {}".format(sample_rate))
+    logger.info("  Number of frames: {}".format((WAVE_End - WAVE_Offset) // WAVE_Frame))
+
+## Read WAVE frames (global WAVE object) without copying
 #  @param n number of frames to read
-#  @return frames frames read
+#  @return frames frames read (memoryview of WAVE data chunk)
 def readWAVE(n):
-    global WAVE
+    global WAVE_Offset
     logger.info("Read WAVE frames")
-    frames = WAVE.readframes(n)
+    start = WAVE_Offset
+    WAVE_Offset = min(start + (n * WAVE_Frame), WAVE_End)
+    frames = WAVE_View[start:WAVE_Offset]
     return frames
 
 ## Close WAVE file (global WAVE object)
 def closeWAVE():
-    global WAVE
+    global WAVE, WAVE_View, Data
     logger.info("Close WAVE file")
+    # Release data slices before unmapping file
+    Data = bytearray()
+    WAVE_View.release()
     WAVE.close()
+    WAVE = None
 
 
 ## Load audio frames into global Data buffer
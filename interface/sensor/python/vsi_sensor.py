@@ -18,8 +18,12 @@
 
 try:
     import logging
+    import mmap
+    import os
     from os import path
-    from struct import unpack
+    from struct import unpack_from
+
+    import numpy as np
 except ImportError as err:
     print(f"VSI:Sensor:ImportError: {err}")
     raise
@@ -29,15 +33,101 @@ except Exception as e:
 
 logger = logging.getLogger(__name__)
 
+class SdsFile:
+    def __init__(self, name, index_cache=True):
+        self.HEADER_SIZE = 8     #B
+        self.name        = name
+        self.index_file  = f"{name}.idx"
+
+        with open(name, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.source = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+            if stat.st_size > 0:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.map = bytes()
+        self.view = memoryview(self.map)
+
+        if not (index_cache and self.__loadIndex()):
+            self.__buildIndex()
+            if index_cache:
+                self.__saveIndex()
+
+        # Prefix sums of payload sizes: size_sum[i] = sum(size[:i])
+        self.size_sum = np.zeros(len(self.size) + 1, dtype=np.int64)
+        np.cumsum(self.size, out=self.size_sum[1:])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    # Scan recording once and build index of record timestamps, payload offsets and sizes
+    def __buildIndex(self):
+        logger.info(f"Build record index: {self.name}")
+        timestamp = []
+        offset    = []
+        size      = []
+        pos = 0
+        while pos + self.HEADER_SIZE <= len(self.map):
+            t, n = unpack_from("II", self.map, pos)
+            pos += self.HEADER_SIZE
+            timestamp.append(t)
+            offset.append(pos)
+            size.append(n)
+            pos += n
+        self.timestamp = np.array(timestamp, dtype=np.int64)
+        self.offset    = np.array(offset, dtype=np.int64)
+        self.size      = np.array(size, dtype=np.int64)
+
+    # Load cached record index, valid if recording size and modification time match
+    def __loadIndex(self):
+        try:
+            with np.load(self.index_file) as index:
+                if not np.array_equal(index["source"], self.source):
+                    return False
+                self.timestamp = index["timestamp"]
+                self.offset    = index["offset"]
+                self.size      = index["size"]
+        except Exception:
+            return False
+        logger.info(f"Loaded record index: {self.index_file}")
+        return True
+
+    # Save record index next to recording, failure (e.g. read-only location) is not an error
+    def __saveIndex(self):
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                np.savez(f, source=self.source, timestamp=self.timestamp, offset=self.offset, size=self.size)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.info(f"Record index not saved: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+    # Return payload of record idx as memoryview of the mapped file
+    def payload(self, idx):
+        start = int(self.offset[idx])
+        return self.view[start:start + int(self.size[idx])]
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.map, mmap.mmap):
+            try:
+                self.map.close()
+            except BufferError:
+                # Payload views are still referenced, file is unmapped when the last one is released
+                pass
+
+
 class RecordManager:
     def __init__(self):
         self.WINDOW_SIZE        = 10000 #ms
         self.SLIDE_INTERVAL     = 1000  #ms
-        self.HEADER_SIZE        = 8     #B
-        self.TIMESTAMP_SIZE     = 4     #B
         self.data_buff          = bytearray()
-        self.timestamp          = []
-        self.data_size          = []
+        self.data_idx           = 0
+        self.record_idx         = 0
         self.interval           = 0
         self.window             = 0
         self.cnt                = 0
@@ -51,8 +141,8 @@ class RecordManager:
     def flush(self):
         logger.info("Flush Record Data")
         self.data_buff          = bytearray()
-        self.timestamp          = []
-        self.data_size          = []
+        self.data_idx           = 0
+        self.record_idx         = 0
         self.interval           = 0
         self.window             = 0
         self.cnt                = 0
@@ -62,33 +152,44 @@ class RecordManager:
         self.initial_interval   = 0
         self.active_record_size = 0
 
-    # Read one Record from data file and save acquired data in corresponding buffers
-    def __getRecord(self):
+    # Read next count Records from data file and save acquired data in data buffer
+    # Record timestamps and sizes are taken from the recording index (SDS), record_idx
+    # is the number of records read so far
+    def __getRecords(self, count=1):
         logger.info("Get Record Data")
-        data = readFile(self.HEADER_SIZE)
-        if len(data) == self.HEADER_SIZE:
-            self.timestamp.append(unpack("I", data[:self.TIMESTAMP_SIZE])[0])
-            self.data_size.append(unpack("I", data[self.TIMESTAMP_SIZE:])[0])
-            self.data_buff.extend(readFile(self.data_size[-1]))
-            logger.debug(f"Record Data size: {len(self.data_buff)}")
+        if SDS is not None:
+            end = min(self.record_idx + count, len(SDS))
+        else:
+            end = self.record_idx
+
+        if end > self.record_idx:
+            # Drop consumed data once it outweighs unconsumed data (amortized O(1) per byte)
+            if self.data_idx >= len(self.data_buff) - self.data_idx:
+                del self.data_buff[:self.data_idx]
+                self.data_idx = 0
+            for idx in range(self.record_idx, end):
+                self.data_buff.extend(SDS.payload(idx))
+            self.record_idx = end
+            logger.debug(f"Record Data size: {len(self.data_buff) - self.data_idx}")
         else:
             logger.info("No Record")
 
     # Extract requested number of bytes from data buffer
+    # Data is consumed by advancing the read index, the buffer is compacted in __getRecords
     # If end of file is reached, return requested number of zeroes
     def getData(self, size):
         logger.info("Get Data from Record")
 
-        if len(self.data_buff) == 0:
-            self.__getRecord()
+        if len(self.data_buff) == self.data_idx:
+            self.__getRecords()
 
-        if len(self.data_buff) >= size:
-            data = self.data_buff[:size]
-            self.data_buff = self.data_buff[size:]
+        if len(self.data_buff) - self.data_idx >= size:
+            data = self.data_buff[self.data_idx:self.data_idx + size]
+            self.data_idx += size
             logger.debug(f"Requested Data size: {size}")
 
             if self.active_record_size == 0:
-                self.active_record_size = self.data_size[self.cnt]
+                self.active_record_size = int(SDS.size[self.cnt])
                 self.cnt += 1
             self.active_record_size -= size
         else:
@@ -101,24 +202,21 @@ class RecordManager:
     # or end of file is reached
     def __getWindow(self):
         window = 0
-        old_timestamp_num = 0
         logger.info("Get Time window")
-        while True:
-            if len(self.timestamp) == 0:
-                self.__getRecord()
+        if self.record_idx == 0:
+            self.__getRecords()
 
-            if len(self.timestamp) == old_timestamp_num:
-                break
-            else:
-                old_timestamp_num = len(self.timestamp)
+        if self.record_idx > 0:
+            t0 = int(SDS.timestamp[self.cnt])
 
-            t0 = self.timestamp[self.cnt]
-            t1 = self.timestamp[-1]
-            window = t1 - t0
-            if window >= self.WINDOW_SIZE:
-                break
-            else:
-                self.__getRecord()
+            # Binary search (timestamps are ascending) for the first record from the last one read
+            # which is at least WINDOW_SIZE ahead of current record, or the last record in file
+            last = self.record_idx - 1
+            last += int(np.searchsorted(SDS.timestamp[last:], t0 + self.WINDOW_SIZE))
+            last = min(last, len(SDS) - 1)
+            self.__getRecords(last + 1 - self.record_idx)
+
+            window = int(SDS.timestamp[last]) - t0
 
         self.window = window
         logger.debug(f"Window size: {self.window} ms")
@@ -131,14 +229,21 @@ class RecordManager:
         else:
             size = SAMPLE_SIZE
 
-        num = int(sum(self.data_size[self.cnt:-1])/size)
+        # Size of records from current record up to (excluding) last record read
+        last = self.record_idx - 1
+        if last > self.cnt:
+            window_size = int(SDS.size_sum[last] - SDS.size_sum[self.cnt])
+        else:
+            window_size = 0
+
+        num = int(window_size/size)
 
         if num > 0:
             self.interval = round((self.window * 1000)/num)
             logger.debug(f"Number of Samples/Blocks: {num}")
 
             # Compensate for time drift
-            record_elapsed_time = (self.timestamp[self.cnt] - self.timestamp[0]) * 1000
+            record_elapsed_time = int(SDS.timestamp[self.cnt] - SDS.timestamp[0]) * 1000
             if self.elapsed_time != record_elapsed_time:
                 interval_correction = round((self.elapsed_time - record_elapsed_time)/num)
                 self.interval -= interval_correction #us
@@ -149,9 +254,9 @@ class RecordManager:
     # SLIDE_INTERVAL ahead of last timestamp used for updating the timer
     def updateTimer(self, interval):
         logger.info("Update AVH TimerEvent interval")
-        if len(self.timestamp) > self.cnt:
-            time_delta = self.timestamp[self.cnt] - self.timestamp[self.cnt_old]
-        elif len(self.timestamp) == 0:
+        if self.record_idx > self.cnt:
+            time_delta = int(SDS.timestamp[self.cnt] - SDS.timestamp[self.cnt_old])
+        elif self.record_idx == 0:
             time_delta = self.SLIDE_INTERVAL
         else:
             time_delta = 0
@@ -188,38 +293,53 @@ class FifoBuff:
         self.idx_get        = 0
         self.count          = 0
 
+    # Put one byte in FIFO, return None if FIFO is full
     def put(self, byte):
-        logger.info("Put byte in FIFO")
-
         # Check if buffer is already full
         if self.count == self.buff_size:
-            logger.info("FIFO is full")
+            logger.debug("FIFO is full")
             return None
         else:
             self.data[self.idx_put] = byte
-            logger.debug(f"Byte {byte} inserted at position {self.idx_put}")
             self.idx_put = (self.idx_put + 1) % self.buff_size
             self.count += 1
             if (self.count >= self.threshold_size) and (self.threshold_size != 0):
                 self.threshold = 1
             return byte
 
+    # Get one byte from FIFO, return None if FIFO is empty
     def get(self):
-        logger.info("Get byte from FIFO")
-
         # Check if buffer is already empty
         if self.count == 0:
-            logger.info("FIFO is empty")
+            logger.debug("FIFO is empty")
             return None
         else:
             byte = self.data[self.idx_get]
-            logger.debug(f"Byte {byte} extracted from position {self.idx_get}")
             self.idx_get = (self.idx_get + 1) % self.buff_size
             self.count -= 1
             if self.count < self.threshold_size:
                 self.threshold = 0
             return byte
 
+    # Put as many bytes from data in FIFO as fit, return number of bytes stored
+    # Storing less than len(data) bytes indicates an overflow
+    # There is no bulk get: the driver drains the FIFO one byte per SAMPLE_PORT read (see get)
+    def put_many(self, data):
+        n = min(len(data), self.buff_size - self.count)
+        if n == 0:
+            logger.debug("FIFO is full")
+            return 0
+
+        # Copy in up to two slices, wrapping around the end of the buffer
+        first = min(n, self.buff_size - self.idx_put)
+        self.data[self.idx_put:self.idx_put + first] = data[:first]
+        self.data[:n - first] = data[first:n]
+        self.idx_put = (self.idx_put + n) % self.buff_size
+        self.count += n
+        if (self.count >= self.threshold_size) and (self.threshold_size != 0):
+            self.threshold = 1
+        logger.debug(f"{n} bytes inserted in FIFO, count: {self.count}")
+        return n
 
 # User registers
 REG_IDX_MAX       = 9     # Maximum user register index used in VSI
@@ -256,43 +376,33 @@ FIFO = FifoBuff(1, 0)
 # Record manager
 Record = RecordManager()
 
+# Recording file
+SDS             = None
+sds_index_cache = True    # Cache record index next to recording file (<name>.sds.idx)
+
 ## Open sensor recording file
 #  @param name name of file to open
 def openFile(name):
-    global file
+    global SDS
 
     logger.info(f"Open recording file (read mode): {name}")
     try:
-        file = open(f"{name}", "rb")
+        SDS = SdsFile(name, sds_index_cache)
     except Exception as e:
+        SDS = None
         logger.info(f"An error occurred when trying to open recording: {e}")
 
 
-## Read data bytes from sensor recording file
-#  @param n_bytes number of bytes to read
-#  @return data
-def readFile(n_bytes):
-    global file
-
-    try:
-        logger.info("Read recording file")
-        data = bytearray(file.read(n_bytes))
-    except Exception as e:
-        logger.debug(f"An error occurred when reading n_bytes = {n_bytes}: {e}")
-        data = bytearray()
-
-    return data
-
-
 ## Close sensor recording file
 def closeFile():
-    global file
+    global SDS
 
     try:
         logger.info("Close recording file")
-        file.close()
+        SDS.close()
     except Exception as e:
         logger.info(f"An error occurred when closing SDS file: {e}")
+    SDS = None
 
 
 ## VSI IRQ Status register
@@ -324,13 +434,10 @@ def timerEvent(IRQ_Status):
     Record.trackTime()
     if (CONTROL & CONTROL_DMA_Msk) == 0:
         data = Record.getData(SAMPLE_SIZE)
-        for b in range(SAMPLE_SIZE):
-            byte = FIFO.put(data[b])
-            if byte is None:
-                STATUS |= STATUS_OVERFLOW_Msk
-                IRQ_Status |= IRQ_Status_Overflow_Msk
-                logger.debug("Overflow detected")
-                break
+        if FIFO.put_many(data) < SAMPLE_SIZE:
+            STATUS |= STATUS_OVERFLOW_Msk
+            IRQ_Status |= IRQ_Status_Overflow_Msk
+            logger.debug("Overflow detected")
 
         if FIFO.threshold:
             IRQ_Status |= IRQ_Status_Threshold_Msk
@@ -430,6 +537,7 @@ def rdSAMPLE_COUNT():
 
 
 ## Read SAMPLE_PORT register (user register)
+#  Each register read returns one byte (sensor_drv_hw.c reads SAMPLE_COUNT * sample size bytes)
 # @return data data read from FIFO buffer (32-bit)
 def rdSAMPLE_PORT():
     data = FIFO.get()
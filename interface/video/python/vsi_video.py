@@ -110,7 +110,7 @@ class VideoClient:
 
 
 # User registers
-REG_IDX_MAX               = 12  # Maximum user register index used in VSI
+REG_IDX_MAX               = 13  # Maximum user register index used in VSI
 MODE                      = 0   # Regs[0]  // Mode: 0=Input, 1=Output
 CONTROL                   = 0   # Regs[1]  // Control: enable, flush
 STATUS                    = 0   # Regs[2]  // Status: active, buf_empty, buf_full, overflow, underflow, eos
@@ -124,6 +124,7 @@ FRAME_RATE                = 0   # Regs[9]  // Frame rate
 FRAME_INDEX               = 0   # Regs[10] // Frame index
 FRAME_COUNT               = 0   # Regs[11] // Frame count
 FRAME_COUNT_MAX           = 0   # Regs[12] // Frame count maximum
+FILENAME_CHARS            = 0   # Regs[13] // Filename characters, 4 per write
 
 # MODE register definitions
 MODE_IO_Msk               = 1<<0
@@ -367,6 +368,15 @@ def wrFILENAME_CHAR(value):
         logger.debug(f"Filename VALID: {FILENAME_VALID}")
 
 
+## Write FILENAME_CHARS register (user register)
+#  @param value value to write (32-bit), up to 4 characters (first character in the lowest byte)
+def wrFILENAME_CHARS(value):
+    for shift in (0, 8, 16, 24):
+        if FilenameIdx == FILENAME_LEN:
+            break
+        wrFILENAME_CHAR(chr((value >> shift) & 0xFF))
+
+
 ## Write FRAME_INDEX register (user register)
 #  @param value value to write (32-bit)
 #  @return value value written (32-bit)
@@ -427,6 +437,8 @@ def rdRegs(index):
         value = FRAME_COUNT
     elif index == 12:
         value = FRAME_COUNT_MAX
+    elif index == 13:
+        value = FILENAME_CHARS
 
     return value
 
@@ -467,5 +479,7 @@ def wrRegs(index, value):
     elif index == 12:
         FRAME_COUNT_MAX = value
         flushBuffer()
+    elif index == 13:
+        wrFILENAME_CHARS(value)
 
     return value
@@ -66,6 +66,7 @@
 #define Reg_FRAME_INDEX         Regs[10] // Frame index
 #define Reg_FRAME_COUNT         Regs[11] // Frame count
 #define Reg_FRAME_COUNT_MAX     Regs[12] // Frame count maximum
+#define Reg_FILENAME_CHARS      Regs[13] // Filename characters, 4 per write
 
 // Video MODE register defintions
 #define Reg_MODE_IO_Pos                 0U
@@ -303,8 +304,10 @@ int32_t VideoDrv_Uninitialize (void) {
 
 // Set Video Interface file
 int32_t VideoDrv_SetFile (uint32_t channel, const char *name) {
-  const char    *p;
         uint32_t n;
+        uint32_t i;
+        uint32_t k;
+        uint32_t chars;
 
   if ((((channel & 1U) == 0U) && ((channel >> 1) >= VIDEO_INPUT_CHANNELS))  ||
       (((channel & 1U) != 0U) && ((channel >> 1) >= VIDEO_OUTPUT_CHANNELS)) ||
@@ -320,11 +323,15 @@ int32_t VideoDrv_SetFile (uint32_t channel, const char *name) {
     return VIDEO_DRV_ERROR;
   }
 
-  // Register Video filename
+  // Register Video filename, 4 characters per write (first character in the lowest byte)
   n = strlen(name);
   pVideo[channel]->Reg_FILENAME_LEN = n;
-  for (p = name; n != 0U; n--) {
-    pVideo[channel]->Reg_FILENAME_CHAR = *p++;
+  for (i = 0U; i < n; i += 4U) {
+    chars = 0U;
+    for (k = 0U; (k < 4U) && ((i + k) < n); k++) {
+      chars |= (uint32_t)(uint8_t)name[i + k] << (k * 8U);
+    }
+    pVideo[channel]->Reg_FILENAME_CHARS = chars;
   }
   if (pVideo[channel]->Reg_FILENAME_VALID == 0U) {
     return VIDEO_DRV_ERROR;
@@ -22,10 +22,17 @@ try:
     import time
     import atexit
     import logging
+    import secrets
     import subprocess
+    from collections import deque
+    from multiprocessing import resource_tracker, shared_memory
     from multiprocessing.connection import Client, Connection
     from os import path, getcwd
     from os import name as os_name
+
+    from vsi_protocol import FLAG_EOS, FLAG_ERROR, SEQ_MASK, sendMessage, recvMessage, packValues, unpackValues, packStrings
+    from vsi_protocol import serverAddress, readAddress
+    from vsi_regs import RegisterMap, READ_ONLY
 except ImportError as err:
     print(f"VSI:Video:ImportError: {err}")
     raise
@@ -36,6 +43,27 @@ except Exception as e:
 logger = logging.getLogger(__name__)
 
 
+def _attachSharedMemory(name):
+    """
+    Attach to a shared memory block created by the server.
+
+    The server owns the block and unlinks it, so the client must not register
+    it with the resource tracker (which would unlink it on client exit).
+    Args:
+        name: Name of the shared memory block.
+    Returns:
+        shm: SharedMemory object.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        shm = shared_memory.SharedMemory(name=name)
+        if os_name != 'nt':
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
 class VideoClient:
     """
     Client for communicating with the VSI video server using Python's multiprocessing connection.
@@ -52,6 +80,8 @@ class VideoClient:
         self.FRAME_READ       = 7
         self.FRAME_WRITE      = 8
         self.CLOSE_SERVER     = 9
+        self.FRAME_BUFFER     = 10
+        self.ENCODE_STATUS    = 11
         # Color space codes
         self.GRAYSCALE8       = 0
         self.RGB888           = 1
@@ -61,18 +91,35 @@ class VideoClient:
         self.NV21             = 5
         # Connection object
         self.conn = None
+        # Sequence number of the last command, sequence numbers of the commands waiting for a reply
+        self.seq              = 0
+        self.replies          = deque()
+        # Shared memory frame buffer
+        self.shm              = None
+        self.shm_slots        = 0
+        self.shm_slot_size    = 0
+        self.shm_slot         = 0
+        # Read requests kept outstanding (read-ahead), read requests not yet replied
+        self.read_ahead       = 0
+        self.read_pending     = 0
+        # Frames written and not yet acknowledged by the server, server encode queue state
+        self.write_pending    = 0
+        self.write_busy       = False
+        # Filename sent to the server and not yet validated, validation result
+        self.filename_pending = False
+        self.filename_valid   = False
 
     def connectToServer(self, address, authkey):
         """
         Attempt to connect to the VSI video server at the given address with the provided authkey.
 
         Args:
-            address: The (IP, port) tuple for the server to connect to.
+            address: The (IP, port) tuple or Unix domain socket path for the server to connect to.
             authkey: The authorization key for server connection.
         Returns:
             None
         """
-        for _ in range(40):
+        for _ in range(80):
             try:
                 self.conn = Client(address, authkey=authkey.encode('utf-8'))
                 if isinstance(self.conn, Connection):
@@ -81,7 +128,66 @@ class VideoClient:
                     self.conn = None
             except Exception:
                 self.conn = None
-            time.sleep(0.05)
+            time.sleep(0.025)
+
+    def attachToServer(self, address, authkey):
+        """
+        Attempt a single connection to an already running VSI video server.
+
+        Args:
+            address: The (IP, port) tuple or Unix domain socket path for the server to connect to.
+            authkey: The authorization key for server connection.
+        Returns:
+            None
+        """
+        try:
+            self.conn = Client(address, authkey=authkey.encode('utf-8'))
+        except Exception:
+            self.conn = None
+
+    def _send(self, opcode, payload=b'', reply=True):
+        """
+        Send a command message to the server.
+        Args:
+            opcode: Command code.
+            payload: Command payload.
+            reply: The server replies to the command.
+        Returns:
+            None
+        """
+        self.seq = (self.seq + 1) & SEQ_MASK
+        sendMessage(self.conn, opcode, self.seq, payload)
+        if reply:
+            self.replies.append(self.seq)
+
+    def _recv(self):
+        """
+        Receive the reply to the oldest command waiting for a reply.
+        Returns:
+            tuple: (flags, payload) of the reply message.
+        """
+        opcode, flags, seq, payload = recvMessage(self.conn)
+        expected = self.replies.popleft()
+        if seq != expected:
+            logger.error(f"_recv: reply sequence number {seq} does not match command {expected}")
+        if flags & FLAG_ERROR:
+            logger.error(f"_recv: command {opcode} failed on the server, session closed by the server")
+
+        return flags, payload
+
+    def _call(self, opcode, *values):
+        """
+        Send a command with integer arguments and wait for the reply.
+        Args:
+            opcode: Command code.
+            values: Integer command arguments.
+        Returns:
+            Tuple of integer values of the reply.
+        """
+        self._send(opcode, packValues(*values))
+        _, payload = self._recv()
+
+        return unpackValues(payload)
 
     def setMode(self, mode):
         """
@@ -91,8 +197,9 @@ class VideoClient:
         Returns:
             Current mode value (0=input, 1=output).
         """
-        self.conn.send([self.SET_MODE, mode])
-        current_mode = self.conn.recv()
+        self._drainWrites()
+        self._cancelReads()
+        current_mode, = self._call(self.SET_MODE, mode)
 
         return current_mode
 
@@ -104,23 +211,57 @@ class VideoClient:
         Returns:
             Device index actually set.
         """
-        self.conn.send([self.SET_DEVICE, device])
-        device_index = self.conn.recv()
+        self._drainWrites()
+        self._cancelReads()
+        device_index, = self._call(self.SET_DEVICE, device)
 
         return device_index
 
     def setFilename(self, filename):
         """
-        Set the filename for the video stream on the server.
+        Set the filename for the video stream on the server, without waiting for the validation.
+
+        The server validates the filename and opens input video files while the simulation
+        continues, the validation result is taken with filenameValid().
         Args:
             filename: The name of the file to set on the server.
         Returns:
-            True if the filename is valid, False otherwise.
+            None
+        """
+        self._drainWrites()
+        self._cancelReads()
+        self._send(self.SET_FILENAME, packStrings(getcwd(), filename))
+        self.filename_pending = True
+        self.filename_valid   = False
+
+    def _takeFilename(self, wait=True):
+        """
+        Take the filename validation reply from the server.
+        Args:
+            wait: Wait for the reply if it is not received yet.
+        Returns:
+            None
+        """
+        if self.filename_pending and (wait or self.conn.poll()):
+            _, payload = self._recv()
+            self.filename_valid   = bool(unpackValues(payload)[0])
+            self.filename_pending = False
+            if not self.filename_valid:
+                logger.error("_takeFilename: filename validation failed, file not found on server")
+
+    def filenameValid(self, wait=True):
+        """
+        Get the filename validation result.
+        Args:
+            wait: Wait for the server reply if it is not received yet.
+        Returns:
+            True if the filename is valid, False if not, None if the reply is not received yet.
         """
-        self.conn.send([self.SET_FILENAME, getcwd(), filename])
-        filename_valid = self.conn.recv()
+        self._takeFilename(wait)
+        if self.filename_pending:
+            return None
 
-        return filename_valid
+        return self.filename_valid
 
     def configureStream(self, frame_width, frame_height, frame_rate, color_format):
         """
@@ -133,10 +274,11 @@ class VideoClient:
         Returns:
             True if configuration is valid, False otherwise.
         """
-        self.conn.send([self.STREAM_CONFIGURE, frame_width, frame_height, frame_rate, color_format])
-        configuration_valid = self.conn.recv()
+        self._drainWrites()
+        self._cancelReads()
+        configuration_valid, = self._call(self.STREAM_CONFIGURE, frame_width, frame_height, frame_rate, color_format)
 
-        return configuration_valid
+        return bool(configuration_valid)
 
     def enableStream(self):
         """
@@ -144,10 +286,11 @@ class VideoClient:
         Returns:
             `True` if the stream is active, `False` otherwise.
         """
-        self.conn.send([self.STREAM_ENABLE])
-        stream_active = self.conn.recv()
+        self._drainWrites()
+        self._cancelReads()
+        stream_active, = self._call(self.STREAM_ENABLE)
 
-        return stream_active
+        return bool(stream_active)
 
     def disableStream(self):
         """
@@ -155,33 +298,218 @@ class VideoClient:
         Returns:
             True if the stream is no longer active, False otherwise.
         """
-        self.conn.send([self.STREAM_DISABLE])
-        stream_active = self.conn.recv()
+        self._drainWrites()
+        self._send(self.STREAM_DISABLE)
+        # Replies to the outstanding read requests precede the reply to STREAM_DISABLE
+        self._cancelReads()
+        _, payload = self._recv()
+        stream_active, = unpackValues(payload)
+
+        self._closeFrameBuffer()
+
+        return bool(stream_active)
+
+    def openFrameBuffer(self, slots):
+        """
+        Request a shared memory frame buffer from the server and attach to it.
+
+        When attached, frames are exchanged through a ring of shared memory slots and
+        the connection carries only the slot index, size and end-of-stream flag.
+        Must be called after the stream is enabled.
+        Args:
+            slots: Number of frame slots in the shared memory ring.
+        Returns:
+            True if the frame buffer is attached, False otherwise (frames are transferred over the connection).
+        """
+        self._drainWrites()
+        self._cancelReads()
+        self._send(self.FRAME_BUFFER, packValues(slots))
+        _, payload = self._recv()
+
+        if len(payload) == 0:
+            # Frame buffer not available
+            return False
+
+        # Payload: slot size followed by the shared memory name
+        slot_size, = unpackValues(payload[:8])
+        name = bytes(payload[8:]).decode('utf-8')
+        try:
+            self.shm = _attachSharedMemory(name)
+        except Exception as e:
+            logger.error(f"openFrameBuffer: failed to attach shared memory {name}: {e}")
+            self.shm = None
+            return False
+
+        self.shm_slots     = slots
+        self.shm_slot_size = slot_size
+        self.shm_slot      = 0
+
+        return True
+
+    def _closeFrameBuffer(self):
+        """
+        Detach from the shared memory frame buffer (if attached).
+        Returns:
+            None
+        """
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+    def _drainWrites(self):
+        """
+        Wait until the server has acknowledged all frames written.
+        Returns:
+            None
+        """
+        self._takeFilename()
+        while self.write_pending > 0:
+            self.__takeWrite()
+
+    def _pollWrites(self):
+        """
+        Take the write acknowledgements already received from the server, without waiting.
+        Returns:
+            None
+        """
+        self._takeFilename(wait=False)
+        if self.filename_pending:
+            return
 
-        return stream_active
+        while (self.write_pending > 0) and self.conn.poll():
+            self.__takeWrite()
+
+    def __takeWrite(self):
+        """
+        Take the acknowledgement of the oldest frame written.
+        Returns:
+            None
+        """
+        _, payload = self._recv()
+        self.write_busy = bool(unpackValues(payload)[0])
+        self.write_pending -= 1
+
+    def writeBusy(self):
+        """
+        Check if the server encode queue is full (frames written now would wait for the encoder).
+
+        The state is taken from the write acknowledgements. When all frames are acknowledged
+        and the queue was full, the server is asked for the current state.
+        Returns:
+            True if the server encode queue is full, False otherwise.
+        """
+        self._pollWrites()
+
+        if self.write_busy and (self.write_pending == 0) and not self.filename_pending:
+            self.write_busy = bool(self._call(self.ENCODE_STATUS)[0])
+
+        return self.write_busy
+
+    def startReads(self, depth):
+        """
+        Start the read-ahead for the active input stream.
+
+        `depth` frame read requests are kept outstanding, so that the server reads the next
+        frames while the simulation runs. With a shared memory frame buffer, the depth is
+        limited to the number of slots (the server must not overwrite a frame not yet read).
+        Args:
+            depth: Number of outstanding read requests (0 = request each frame on read).
+        Returns:
+            None
+        """
+        if self.shm is not None:
+            depth = min(depth, self.shm_slots)
+
+        self.read_ahead = depth
+        self.__requestReads()
+
+    def __requestReads(self):
+        """
+        Send frame read requests until `read_ahead` requests are outstanding.
+        Returns:
+            None
+        """
+        while self.read_pending < self.read_ahead:
+            self._send(self.FRAME_READ)
+            self.read_pending += 1
+
+    def _cancelReads(self):
+        """
+        Stop the read-ahead and discard the replies to the outstanding read requests.
+        Returns:
+            None
+        """
+        self.read_ahead = 0
+        while self.read_pending > 0:
+            self._recv()
+            self.read_pending -= 1
 
     def readFrame(self):
         """
-        Request a video frame from the server.
+        Read a video frame from the server.
+
+        With read-ahead, the frame of the oldest outstanding read request is returned and
+        a new request is sent. The read-ahead stops at the end of stream.
         Returns:
-            tuple: (data, eos) where data is a Bytearray of frame data and eos is a Boolean indicating end-of-stream.
+            tuple: (data, eos) where data is a bytes-like object of frame data and eos is a Boolean indicating end-of-stream.
         """
-        self.conn.send([self.FRAME_READ])
-        data = self.conn.recv_bytes()
-        eos  = self.conn.recv()
+        self._drainWrites()
+        if self.read_pending == 0:
+            self._send(self.FRAME_READ)
+            self.read_pending += 1
+
+        flags, payload = self._recv()
+        self.read_pending -= 1
+
+        if self.shm is not None:
+            # Frame is stored in shared memory slot
+            slot, size = unpackValues(payload)
+            offset = slot * self.shm_slot_size
+            data = bytearray(self.shm.buf[offset:offset + size])
+        else:
+            # Frame is carried in the reply message
+            data = payload
+
+        eos = bool(flags & FLAG_EOS)
+        if eos:
+            # Requests sent after the end of stream are answered without data
+            self._cancelReads()
+        else:
+            self.__requestReads()
 
         return data, eos
 
     def writeFrame(self, data):
         """
         Send a video frame to the server.
+
+        Frames are acknowledged by the server asynchronously, the acknowledgements report
+        the state of the server encode queue (see writeBusy).
         Args:
             data: Bytearray of frame data to write.
         Returns:
             None
         """
-        self.conn.send([self.FRAME_WRITE])
-        self.conn.send_bytes(data)
+        self._pollWrites()
+
+        if self.shm is not None:
+            # Wait until the server has consumed the oldest slot when all slots are in use
+            if self.write_pending == self.shm_slots:
+                self._takeFilename()
+                self.__takeWrite()
+
+            # Store frame in the next shared memory slot
+            slot = self.shm_slot
+            size = min(len(data), self.shm_slot_size)
+            offset = slot * self.shm_slot_size
+            self.shm.buf[offset:offset + size] = data[:size]
+
+            self._send(self.FRAME_WRITE, packValues(slot, size))
+            self.shm_slot = (slot + 1) % self.shm_slots
+        else:
+            self._send(self.FRAME_WRITE, data)
+
+        self.write_pending += 1
 
     def closeServer(self):
         """
@@ -191,8 +519,12 @@ class VideoClient:
         """
         try:
             if isinstance(self.conn, Connection):
-                self.conn.send([self.CLOSE_SERVER])
+                # Take the replies to the outstanding commands, the server must not reply to a closed connection
+                self._drainWrites()
+                self._cancelReads()
+                self._send(self.CLOSE_SERVER, reply=False)
                 self.conn.close()
+            self._closeFrameBuffer()
         except Exception as e:
             logger.error(f'Exception occurred on cleanup: {e}')
 
@@ -200,13 +532,14 @@ class VideoClient:
 
 # User register variables (simulate hardware registers for VSI peripheral)
 CONTROL                   = 0     # Regs[0]  // Control: enable, mode, continuous
-STATUS                    = 0     # Regs[1]  // Status: active, eos, file_name, file_valid
+STATUS                    = 0     # Regs[1]  // Status: active, eos, file_name, file_valid, busy
 DEVICE                    = -1    # Regs[2]  // Streaming device
 FILENAME                  = ""    # Regs[3]  // Filename string array
 FRAME_WIDTH               = 300   # Regs[4]  // Requested frame width
 FRAME_HEIGHT              = 300   # Regs[5]  // Requested frame height
 FRAME_RATE                = 0     # Regs[6]  // Frame rate
 FRAME_COLOR               = 0     # Regs[7]  // Frame color space
+FILENAME_PACKED           = 0     # Regs[8]  // Filename string, 4 characters per write
 
 
 # CONTROL register bit definitions
@@ -227,6 +560,14 @@ STATUS_DATA_Msk           = 1<<1    # Data is available
 STATUS_EOS_Msk            = 1<<2    # End of stream
 STATUS_FILE_NAME_Msk      = 1<<3    # File name latched/received
 STATUS_FILE_VALID_Msk     = 1<<4    # File is valid
+STATUS_BUSY_Msk           = 1<<5    # Output frame encode queue is full
+
+
+# Number of shared memory frame buffer slots (0 = transfer frames over the connection)
+FRAME_BUFFER_SLOTS        = 2
+
+# Number of frame read requests kept outstanding while a continuous input stream is active (0 = request each frame on read)
+READ_AHEAD                = 2
 
 
 # Global variables for video client and filename handling
@@ -243,38 +584,85 @@ def cleanup():
     Video.closeServer()
 
 
-def init(address, authkey):
+def init(address, authkey, prefetch=0, cache_dir=None, daemon=False, encode_queue=4, interpolation='linear'):
     """
     Initialize connection to the VSI Video Server and start the server process if not already running.
+
+    In daemon mode, the client attaches to a video server daemon already listening on the address
+    and starts a new daemon only if none is running. The daemon keeps running after the client exits
+    and serves subsequent clients, with the prefetch, cache, encode queue and interpolation settings of the client
+    which started it.
+    Otherwise the server is started for this client only. It binds a free TCP port instead of the configured
+    port and reports the bound address through a pipe, so that simulations running in parallel do not collide.
     Args:
-        address: Tuple (IP, port) for the server.
-        authkey: Authorization key for server connection.
+        address: Tuple (IP, port) for the server, or ('unix', port) for a Unix domain socket
+                 (see vsi_protocol.serverAddress).
+        authkey: Authorization key for server connection. A server started for this client only uses the key
+                 with a random per-run suffix.
+        prefetch: Number of input frames decoded ahead by the server (0 = disabled).
+        cache_dir: Directory of the server converted input frame cache (None = disabled).
+        daemon: True to use a long-lived video server daemon shared between clients.
+        encode_queue: Number of output frames queued for encoding by the server (0 = encode on write).
+        interpolation: Resize interpolation of input frames ('nearest', 'linear', 'area' or 'cubic').
     Returns:
         None
     """
 
     base_dir = path.dirname(__file__)
     server_path = path.join(base_dir, 'vsi_video_server.py')
+    address = serverAddress(address, shared=daemon)
 
-    logger.info("Start video server")
-    if path.isfile(server_path):
-        # Start Video Server as a subprocess
-        if os_name == 'nt':
-            py_cmd = 'python'
+    if daemon:
+        # Attach to running Video Server daemon
+        Video.attachToServer(address, authkey)
+        if Video.conn != None:
+            logger.info("Attached to running video server daemon")
+
+    if Video.conn == None:
+        if path.isfile(server_path):
+            logger.info("Start video server")
+            # Start Video Server as a subprocess
+            if os_name == 'nt':
+                py_cmd = 'python'
+            else:
+                py_cmd = 'python3'
+            if not daemon:
+                # Server of this simulation only: per-run authorization key
+                authkey = f"{authkey}-{secrets.token_hex(8)}"
+            cmd = [py_cmd, server_path,
+                   "--authkey", authkey,
+                   "--prefetch", str(prefetch),
+                   "--encode-queue", str(encode_queue),
+                   "--interpolation", interpolation]
+            if isinstance(address, str):
+                cmd += ["--unix", address]
+            elif daemon:
+                cmd += ["--ip", address[0], "--port", str(address[1])]
+            else:
+                # TCP port is allocated by the server
+                cmd += ["--ip", address[0], "--port", "0"]
+            if cache_dir is not None:
+                cmd += ["--cache-dir", cache_dir]
+            if daemon:
+                # Daemon is started in its own session to outlive the simulation, detached from
+                # the simulation standard streams so that it does not hold pipes reading its output
+                cmd += ["--daemon"]
+                subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                 start_new_session=(os_name != 'nt'))
+            else:
+                # Server reports the bound address through its standard output
+                cmd += ["--report"]
+                server = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+                address = readAddress(server.stdout, address)
+                logger.info(f"Video server address: {address}")
+
+            # Connect to Video Server
+            if address is not None:
+                Video.connectToServer(address, authkey)
+            if Video.conn == None:
+                logger.error("Server not connected")
         else:
-            py_cmd = 'python3'
-        cmd = f"{py_cmd} {server_path} "\
-              f"--ip {address[0]} "\
-              f"--port {address[1]} "\
-              f"--authkey {authkey}"
-        subprocess.Popen(cmd, shell=True)
-
-        # Connect to Video Server
-        Video.connectToServer(address, authkey)
-        if Video.conn == None:
-            logger.error("Server not connected")
-    else:
-        logger.error(f"Server script not found: {server_path}")
+            logger.error(f"Server script not found: {server_path}")
 
     # Register clean-up function
     atexit.register(cleanup)
@@ -343,6 +731,12 @@ def wrDataDMA(data, size):
         STATUS |= STATUS_DATA_Msk
         logger.debug("wrDataDMA: STATUS register updated: DATA bit set")
 
+        # Report server encode queue state known from the write acknowledgements
+        if Video.write_busy:
+            STATUS |=  STATUS_BUSY_Msk
+        else:
+            STATUS &= ~STATUS_BUSY_Msk
+
 
 def wrCONTROL(value):
     """
@@ -350,6 +744,8 @@ def wrCONTROL(value):
 
     Args:
         value: 32-bit value to write to CONTROL register.
+    Returns:
+        value: Value written.
     """
     global CONTROL, STATUS
 
@@ -367,6 +763,9 @@ def wrCONTROL(value):
         if (value & CONTROL_ENABLE_Msk) != 0:
             logger.info("wrCONTROL: CONTROL register updated: ENABLE bit set")
 
+            # Take the filename validation result before the stream is configured
+            updateFileValid(wait=True)
+
             # Configure stream
             configuration_valid = Video.configureStream(FRAME_WIDTH, FRAME_HEIGHT, FRAME_RATE, FRAME_COLOR)
             if configuration_valid:
@@ -374,6 +773,14 @@ def wrCONTROL(value):
                 server_active = Video.enableStream()
 
                 if server_active:
+                    if FRAME_BUFFER_SLOTS > 0:
+                        if not Video.openFrameBuffer(FRAME_BUFFER_SLOTS):
+                            logger.warning("wrCONTROL: shared memory frame buffer not available, using connection")
+
+                    if (value & (CONTROL_MODE_Msk | CONTROL_CONTINUOUS_Msk)) == CONTROL_CONTINUOUS_Msk:
+                        # Continuous input stream: server reads the next frames while the simulation runs
+                        Video.startReads(READ_AHEAD)
+
                     STATUS |=  STATUS_ACTIVE_Msk
                     STATUS &= ~STATUS_EOS_Msk
                 else:
@@ -384,11 +791,13 @@ def wrCONTROL(value):
             logger.info("wrCONTROL: CONTROL register updated: ENABLE bit cleared")
             Video.disableStream()
 
-            STATUS &= ~STATUS_ACTIVE_Msk
-            logger.info("wrCONTROL: STATUS register updated: ACTIVE bit cleared")
+            STATUS &= ~(STATUS_ACTIVE_Msk | STATUS_BUSY_Msk)
+            logger.info("wrCONTROL: STATUS register updated: ACTIVE and BUSY bits cleared")
 
     CONTROL = value
 
+    return value
+
 
 def rdSTATUS():
     """
@@ -398,7 +807,19 @@ def rdSTATUS():
         status: Current STATUS register value (32-bit)
     """
     global STATUS
-    logger.info(f"rdSTATUS: read STATUS: 0x{STATUS:08X}")
+
+    if (STATUS & (STATUS_FILE_NAME_Msk | STATUS_FILE_VALID_Msk)) == STATUS_FILE_NAME_Msk:
+        # Filename validation pending: update FILE_VALID bit if the server reply is received
+        updateFileValid(wait=False)
+
+    if (STATUS & STATUS_ACTIVE_Msk) and (CONTROL & CONTROL_MODE_Msk):
+        # Output stream: update BUSY bit with the server encode queue state
+        if Video.writeBusy():
+            STATUS |=  STATUS_BUSY_Msk
+        else:
+            STATUS &= ~STATUS_BUSY_Msk
+
+    logger.info(f"rdSTATUS: read {Registers.decode(1, STATUS)}")
     value = STATUS
 
     # Clear DATA bit on read of STATUS register
@@ -416,12 +837,14 @@ def wrDEVICE(value):
     Args:
         value: Device index to set.
     Returns:
-        None
+        value: Value written.
     """
     global DEVICE
     DEVICE = Video.setDevice(value)
     logger.info(f"wrDEVICE: DEVICE register set to {DEVICE}")
 
+    return value
+
 
 def rdFILENAME():
     """
@@ -446,7 +869,7 @@ def wrFILENAME(value):
     Args:
         value: Character to append (as string or int)
     Returns:
-        None
+        value: Value written.
     """
     global FILENAME, STATUS
 
@@ -471,11 +894,67 @@ def wrFILENAME(value):
         STATUS |= STATUS_FILE_NAME_Msk
         logger.debug("wrFILENAME: STATUS register updated: FILE_NAME bit set")
 
-        if Video.setFilename(FILENAME) == True:
-            STATUS |= STATUS_FILE_VALID_Msk
-            logger.debug("wrFILENAME: STATUS register updated: FILE_VALID bit set")
-        else:
-            logger.error("wrFILENAME: Filename validation failed, file not found on server")
+        # Filename is validated by the server in the background (see updateFileValid)
+        Video.setFilename(FILENAME)
+
+    return value
+
+
+def wrFILENAME_PACKED(value):
+    """
+    Write FILENAME_PACKED register (user register).
+
+    Append up to 4 characters packed in argument `value` (first character in the lowest byte)
+    to the filename string, like 4 writes to the FILENAME register.
+    A zero byte sets the null terminator, the following bytes are ignored.
+    Args:
+        value: Packed characters (32-bit)
+    Returns:
+        value: Value written.
+    """
+    for shift in (0, 8, 16, 24):
+        char = (value >> shift) & 0xFF
+        wrFILENAME(char)
+        if char == 0:
+            break
+
+    return value
+
+
+def updateFileValid(wait):
+    """
+    Update the FILE_VALID bit of the STATUS register with the server filename validation result.
+
+    Args:
+        wait: Wait for the server reply if it is not received yet.
+    Returns:
+        None
+    """
+    global STATUS
+
+    if (STATUS & (STATUS_FILE_NAME_Msk | STATUS_FILE_VALID_Msk)) != STATUS_FILE_NAME_Msk:
+        return
+
+    if Video.filenameValid(wait):
+        STATUS |= STATUS_FILE_VALID_Msk
+        logger.debug("updateFileValid: STATUS register updated: FILE_VALID bit set")
+
+
+# User register map
+Registers = RegisterMap(globals())
+Registers.register(0, "CONTROL",  write=wrCONTROL,
+                   fields={"ENABLE": CONTROL_ENABLE_Msk, "MODE": CONTROL_MODE_Msk, "CONTINUOUS": CONTROL_CONTINUOUS_Msk})
+Registers.register(1, "STATUS",   read=rdSTATUS, write=READ_ONLY,
+                   fields={"ACTIVE": STATUS_ACTIVE_Msk, "DATA": STATUS_DATA_Msk, "EOS": STATUS_EOS_Msk,
+                           "FILE_NAME": STATUS_FILE_NAME_Msk, "FILE_VALID": STATUS_FILE_VALID_Msk,
+                           "BUSY": STATUS_BUSY_Msk})
+Registers.register(2, "DEVICE",   write=wrDEVICE)
+Registers.register(3, "FILENAME", read=rdFILENAME, write=wrFILENAME)
+Registers.register(4, "FRAME_WIDTH")
+Registers.register(5, "FRAME_HEIGHT")
+Registers.register(6, "FRAME_RATE")
+Registers.register(7, "FRAME_COLOR")
+Registers.register(8, "FILENAME_PACKED", read=rdFILENAME, write=wrFILENAME_PACKED)
 
 
 def rdRegs(index):
@@ -488,27 +967,7 @@ def rdRegs(index):
     Returns:
         value: Value read (32-bit)
     """
-    global CONTROL, DEVICE, FRAME_WIDTH, FRAME_HEIGHT, FRAME_RATE, FRAME_COLOR
-    value = 0
-
-    if   index == 0:
-        value = CONTROL
-    elif index == 1:
-        value = rdSTATUS()
-    elif index == 2:
-        value = DEVICE
-    elif index == 3:
-        value = rdFILENAME()
-    elif index == 4:
-        value = FRAME_WIDTH
-    elif index == 5:
-        value = FRAME_HEIGHT
-    elif index == 6:
-        value = FRAME_RATE
-    elif index == 7:
-        value = FRAME_COLOR
-
-    return value
+    return Registers.rd[index]()
 
 
 def wrRegs(index, value):
@@ -522,23 +981,4 @@ def wrRegs(index, value):
     Returns:
         value: Value written (32-bit)
     """
-    global STATUS, FRAME_WIDTH, FRAME_HEIGHT,  FRAME_RATE, FRAME_COLOR
-
-    if   index == 0:
-        wrCONTROL(value)
-    elif index == 1:
-        value = STATUS
-    elif index == 2:
-        wrDEVICE(value)
-    elif index == 3:
-        wrFILENAME(value)
-    elif index == 4:
-        FRAME_WIDTH = value
-    elif index == 5:
-        FRAME_HEIGHT = value
-    elif index == 6:
-        FRAME_RATE = value
-    elif index == 7:
-        FRAME_COLOR = value
-
-    return value
+    return Registers.wr[index](value)
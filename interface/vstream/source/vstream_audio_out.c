@@ -40,6 +40,7 @@
 #define CHANNELS                Regs[4]  /* Number of channels                         */
 #define SAMPLE_RATE             Regs[5]  /* Samples per second                         */
 #define SAMPLE_BITS             Regs[6]  /* Number of bits per sample                  */
+#define FILENAME_PACKED         Regs[8]  /* Filename string, 4 characters per write    */
 
 /* CONTROL register definitions */
 #define CONTROL_ENABLE_Pos      0U                             /* Cleared= Disabled, Set= Enabled  */
@@ -157,6 +158,8 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
   char *fn;
   uint32_t len;
   uint32_t i;
+  uint32_t n;
+  uint32_t chars;
 
   hAudioOut.callback  = event_cb;
   hAudioOut.active    = 0U;
@@ -183,9 +186,13 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
     /* Add null terminator */
     len += 1U;
 
-    /* Load filename register */
-    for (i = 0; i < len; i++) {
-      AudioOut->FILENAME = fn[i];
+    /* Load filename register, 4 characters per write (first character in the lowest byte) */
+    for (i = 0U; i < len; i += 4U) {
+      chars = 0U;
+      for (n = 0U; (n < 4U) && ((i + n) < len); n++) {
+        chars |= (uint32_t)(uint8_t)fn[i + n] << (n * 8U);
+      }
+      AudioOut->FILENAME_PACKED = chars;
     }
 
     if ((AudioOut->STATUS & STATUS_FILE_NAME_Msk) == 0U) {
@@ -41,6 +41,7 @@
 #define FRAME_HEIGHT            Regs[5]  /* Requested frame height                     */
 #define FRAME_RATE              Regs[6]  /* Frame rate                                 */
 #define FRAME_COLOR             Regs[7]  /* Frame color space                          */
+#define FILENAME_PACKED         Regs[8]  /* Filename string, 4 characters per write    */
 
 /* CONTROL register definitions */
 #define CONTROL_ENABLE_Pos      0U                             /* Cleared= Disabled, Set= Enabled  */
@@ -159,6 +160,8 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
   char *fn;
   uint32_t len;
   uint32_t i;
+  uint32_t n;
+  uint32_t chars;
 
   hVideoIn.callback = event_cb;
   hVideoIn.active   = 0U;
@@ -187,9 +190,13 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
     /* Add null terminator */
     len += 1U;
 
-    /* Load filename register */
-    for (i = 0; i < len; i++) {
-      VideoIn->FILENAME = fn[i];
+    /* Load filename register, 4 characters per write (first character in the lowest byte) */
+    for (i = 0U; i < len; i += 4U) {
+      chars = 0U;
+      for (n = 0U; (n < 4U) && ((i + n) < len); n++) {
+        chars |= (uint32_t)(uint8_t)fn[i + n] << (n * 8U);
+      }
+      VideoIn->FILENAME_PACKED = chars;
     }
 
     if ((VideoIn->STATUS & STATUS_FILE_NAME_Msk) == 0U) {
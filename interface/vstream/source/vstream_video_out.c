@@ -41,6 +41,7 @@
 #define FRAME_HEIGHT            Regs[5]  /* Requested frame height                     */
 #define FRAME_RATE              Regs[6]  /* Frame rate                                 */
 #define FRAME_COLOR             Regs[7]  /* Frame color space                          */
+#define FILENAME_PACKED         Regs[8]  /* Filename string, 4 characters per write    */
 
 /* CONTROL register definitions */
 #define CONTROL_ENABLE_Pos      0U                             /* Cleared= Disabled, Set= Enabled  */
@@ -61,6 +62,10 @@
 #define STATUS_FILE_NAME_Msk    (1UL << STATUS_FILE_NAME_Pos)
 #define STATUS_FILE_VALID_Pos   4U
 #define STATUS_FILE_VALID_Msk   (1UL << STATUS_FILE_VALID_Pos)
+#define STATUS_BUSY_Pos         5U                             /* Set= Server encode queue is full */
+#define STATUS_BUSY_Msk         (1UL << STATUS_BUSY_Pos)
+/* STATUS BUSY is informational: frames released while it is set are not rejected,
+   the server waits for its encoder. The application may poll it to pace its output. */
 
 /* IRQ_* register definitions */
 #define IRQ_TIMER_OVERFLOW_Pos  0U
@@ -158,6 +163,8 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
   char *fn;
   uint32_t len;
   uint32_t i;
+  uint32_t n;
+  uint32_t chars;
 
   hVideoOut.callback  = event_cb;
   hVideoOut.active    = 0U;
@@ -185,9 +192,13 @@ static int32_t Initialize (vStreamEvent_t event_cb) {
     /* Add null terminator */
     len += 1U;
 
-    /* Load filename register */
-    for (i = 0; i < len; i++) {
-      VideoOut->FILENAME = fn[i];
+    /* Load filename register, 4 characters per write (first character in the lowest byte) */
+    for (i = 0U; i < len; i += 4U) {
+      chars = 0U;
+      for (n = 0U; (n < 4U) && ((i + n) < len); n++) {
+        chars |= (uint32_t)(uint8_t)fn[i + n] << (n * 8U);
+      }
+      VideoOut->FILENAME_PACKED = chars;
     }
 
     if ((VideoOut->STATUS & STATUS_FILE_NAME_Msk) == 0U) {
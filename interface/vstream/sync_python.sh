@@ -0,0 +1,67 @@
+#!/usr/bin/env bash
+# Copyright (c) 2026 Arm Limited. All rights reserved.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the License); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Synchronize the vStream VSI Python scripts with their copies.
+#
+# interface/vstream/python is the source of the vStream VSI Python scripts. The board
+# layers (board/*/vsi/python) and the board layers of the examples (example/*/board/*/vsi/python)
+# contain copies of these scripts, so that each board layer can be used by a simulation model
+# on its own. interface/python/vsi_log.py is a copy of the logging module.
+#
+# Usage: sync_python.sh [--check]
+#   --check  Do not copy, report copies which differ from the source (exit status 1)
+
+set -o pipefail
+
+script_dir="$(cd "$(dirname "$0")" && pwd)"
+root_dir="$(cd "${script_dir}/../.." && pwd)"
+source_dir="${script_dir}/python"
+
+check=0
+if [ "$1" = "--check" ]; then
+  check=1
+elif [ -n "$1" ]; then
+  echo "Usage: $(basename "$0") [--check]" >&2
+  exit 2
+fi
+
+# Pairs of source file and copy
+copies=()
+for dir in "${root_dir}"/board/*/vsi/python "${root_dir}"/example/*/board/*/vsi/python; do
+  for file in "${source_dir}"/*.py; do
+    copies+=("${file}" "${dir}/$(basename "${file}")")
+  done
+done
+copies+=("${source_dir}/vsi_log.py" "${root_dir}/interface/python/vsi_log.py")
+
+differ=0
+for ((i = 0; i < ${#copies[@]}; i += 2)); do
+  src="${copies[i]}"
+  dst="${copies[i + 1]}"
+  if cmp -s "${src}" "${dst}"; then
+    continue
+  fi
+  if [ ${check} -eq 1 ]; then
+    echo "Differs from ${src#"${root_dir}"/}: ${dst#"${root_dir}"/}"
+    differ=1
+  else
+    cp "${src}" "${dst}"
+    echo "Updated ${dst#"${root_dir}"/}"
+  fi
+done
+
+exit ${differ}